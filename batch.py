@@ -0,0 +1,170 @@
+"""Render hand effects onto a video file, optionally across worker processes
+
+The video is split into segments rendered by independent trackers and
+concatenated without re-encoding. Each segment starts ``warmup_frames``
+early so smoothing, trails and MediaPipe's tracking state are warm at
+its first frame; that state only approximates a sequential run. Effect
+animation follows the absolute frame number (``frame_clock_animation``)
+so it does not restart at every segment boundary.
+"""
+import argparse
+import cv2
+import imageio
+import imageio_ffmpeg
+import math
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from main import HandEffectTracker
+
+# (input path, segment output path, start frame, end frame or None for EOF,
+#  warm-up frames, fps, effects folder)
+SegmentJob = Tuple[str, str, int, Optional[int], int, float, str]
+
+
+def probe_video(path: str) -> Tuple[int, float]:
+    """Return (frame count, fps) of a video file; frame count is 0 if unknown"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video: {path}")
+    frame_count = max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+    return frame_count, fps
+
+
+def plan_segments(frame_count: int, fps: float, workers: int,
+                  segment_seconds: Optional[float] = None) -> List[Tuple[int, Optional[int]]]:
+    """Split a video into [start, end) frame ranges; the last range runs to EOF"""
+    if frame_count <= 0:
+        return [(0, None)]
+
+    if segment_seconds:
+        segment_length = max(1, int(round(segment_seconds * fps)))
+    else:
+        segment_length = math.ceil(frame_count / max(1, workers))
+
+    starts = list(range(0, frame_count, segment_length))
+    segments = [(start, start + segment_length) for start in starts[:-1]]
+    segments.append((starts[-1], None))  # Frame counts are estimates; read to the end
+    return segments
+
+
+def _render_segment(job: SegmentJob) -> Tuple[str, int]:
+    """Worker: render one segment with its own tracker (and MediaPipe instance)"""
+    input_path, output_path, start, end, warmup_frames, fps, effects_folder = job
+    tracker = HandEffectTracker(effects_folder)
+    tracker.config['frame_clock_animation'] = True
+
+    # Start early and discard the first frames so smoothing, trails and
+    # MediaPipe's tracking state are warm when the segment begins
+    frame_idx = max(0, start - warmup_frames)
+    tracker.frame_count = frame_idx  # Counts absolute frames, so animations line up across segments
+    cap = cv2.VideoCapture(input_path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+    writer = imageio.get_writer(output_path, fps=fps, codec='libx264', quality=8)
+
+    written = 0
+    try:
+        while end is None or frame_idx < end:
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            processed_frame = tracker.process_frame(frame)
+            if frame_idx >= start:
+                writer.append_data(cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB))
+                written += 1
+            frame_idx += 1
+    finally:
+        cap.release()
+        writer.close()
+        tracker.hands.close()
+
+    return output_path, written
+
+
+def _concat_segments(segment_paths: List[str], output_path: str) -> None:
+    """Stitch encoded segments in order without re-encoding"""
+    if len(segment_paths) == 1:
+        shutil.move(segment_paths[0], output_path)
+        return
+
+    list_path = os.path.join(os.path.dirname(segment_paths[0]), "segments.txt")
+    with open(list_path, "w") as f:
+        for path in segment_paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+
+    subprocess.run([imageio_ffmpeg.get_ffmpeg_exe(), "-y", "-loglevel", "error",
+                    "-f", "concat", "-safe", "0", "-i", list_path,
+                    "-c", "copy", output_path], check=True)
+
+
+def process_video(input_path: str, output_path: str, workers: int = 1,
+                  segment_seconds: Optional[float] = None, warmup_frames: int = 30,
+                  effects_folder: str = "effects") -> Dict[str, float]:
+    """Render a video file headlessly, optionally sharded across worker processes"""
+    frame_count, fps = probe_video(input_path)
+    segments = plan_segments(frame_count, fps, workers, segment_seconds)
+    start_time = time.perf_counter()
+
+    with tempfile.TemporaryDirectory(prefix="hand_effects_") as tmp_dir:
+        jobs = [(input_path, os.path.join(tmp_dir, f"segment_{i:04d}.mp4"),
+                 start, end, warmup_frames, fps, effects_folder)
+                for i, (start, end) in enumerate(segments)]
+
+        if workers <= 1 or len(jobs) == 1:
+            results = [_render_segment(job) for job in jobs]
+        else:
+            # spawn keeps each worker's MediaPipe graph independent of the parent
+            ctx = multiprocessing.get_context("spawn")
+            with ctx.Pool(processes=min(workers, len(jobs))) as pool:
+                results = []
+                for path, written in pool.imap(_render_segment, jobs):
+                    results.append((path, written))
+                    print(f"Segment {len(results)}/{len(jobs)} done ({written} frames)")
+
+        results = [(path, written) for path, written in results if written > 0]
+        if not results:
+            raise RuntimeError(f"No frames could be read from {input_path}")
+        _concat_segments([path for path, _ in results], output_path)
+
+    elapsed = time.perf_counter() - start_time
+    frames = sum(written for _, written in results)
+    return {
+        'frames': frames,
+        'segments': len(results),
+        'seconds': elapsed,
+        'fps': frames / elapsed if elapsed > 0 else 0.0,
+        'realtime_factor': (frames / fps) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main():
+    """Command line entry point for offline rendering"""
+    parser = argparse.ArgumentParser(description="Render hand effects onto a video file")
+    parser.add_argument("input", help="Input video file")
+    parser.add_argument("output", help="Output video file (encoded with imageio-ffmpeg)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--segment-seconds", type=float, default=None,
+                        help="Segment length in seconds (default: one segment per worker)")
+    parser.add_argument("--warmup", type=int, default=30,
+                        help="Frames replayed before each segment to warm up hand state")
+    parser.add_argument("--effects", default="effects", help="Effects folder")
+    args = parser.parse_args()
+
+    stats = process_video(args.input, args.output, workers=args.workers,
+                          segment_seconds=args.segment_seconds,
+                          warmup_frames=args.warmup, effects_folder=args.effects)
+    print(f"Rendered {stats['frames']} frames in {stats['seconds']:.1f}s "
+          f"({stats['fps']:.1f} fps, {stats['realtime_factor']:.1f}x real-time)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Micro-benchmark: legacy float64 alpha blending vs premultiplied uint8 compositing
+
+Run from the repository root:
+    python benchmarks/bench_compositing.py
+"""
+import os
+import sys
+import time
+
+import cv2
+import imageio
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from compositing import AlphaCompositor, premultiply
+
+EFFECT_PATH = os.path.join(os.path.dirname(__file__), '..', 'effects', 'efek-api-unscreen.gif')
+SIZES = [60, 120, 180, 240, 300, 400]
+REPEATS = 200
+
+
+def legacy_blend(roi: np.ndarray, effect_region: np.ndarray) -> None:
+    """Blending exactly as _overlay_effect_optimized did before premultiplication"""
+    effect_rgb = effect_region[:, :, :3]
+    alpha = effect_region[:, :, 3:4] / 255.0
+    roi[...] = (alpha * effect_rgb + (1 - alpha) * roi).astype(np.uint8)
+
+
+def time_call(fn, repeats: int = REPEATS) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main():
+    rgba = [np.array(f) for f in imageio.mimread(EFFECT_PATH) if np.array(f).shape[2] == 4]
+    effect = rgba[len(rgba) // 2]
+    compositor = AlphaCompositor(max_size=max(SIZES))
+    rng = np.random.default_rng(0)
+
+    print(f"{'size':>6} {'legacy_us':>10} {'premul_us':>10} {'speedup':>8} {'max_diff':>8}")
+    for size in SIZES:
+        resized = cv2.resize(effect, (size, size), interpolation=cv2.INTER_LINEAR)
+        sprite = premultiply(resized)
+        frame = rng.integers(0, 256, (720, 720, 3), dtype=np.uint8)
+
+        legacy_frame = frame.copy()
+        premul_frame = frame.copy()
+        legacy_blend(legacy_frame[100:100 + size, 100:100 + size], resized)
+        compositor.blend(premul_frame[100:100 + size, 100:100 + size], sprite.color, sprite.inv_alpha)
+        max_diff = int(np.abs(legacy_frame.astype(np.int16) - premul_frame.astype(np.int16)).max())
+
+        legacy_us = time_call(lambda: legacy_blend(legacy_frame[100:100 + size, 100:100 + size], resized))
+        premul_us = time_call(lambda: compositor.blend(premul_frame[100:100 + size, 100:100 + size],
+                                                       sprite.color, sprite.inv_alpha))
+        print(f"{size:>6} {legacy_us:>10.1f} {premul_us:>10.1f} {legacy_us / premul_us:>7.1f}x {max_diff:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Micro-benchmark: legacy flip/resize/crop/cvtColor vs FrameBufferPool
+
+Reports time and peak traced allocation for both paths, plus the largest
+pixel difference between them (the pool resizes a pre-cropped region, so
+only the outermost columns can differ). Exits non-zero if the pool path
+allocates more than ``MAX_POOL_BYTES`` in steady state.
+
+Run from the repository root:
+    python benchmarks/bench_preprocess.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from preprocess import FrameBufferPool
+
+CAMERA_SIZES = [(480, 640), (720, 1280), (1080, 1920)]
+REPEATS = 200
+MAX_POOL_BYTES = 4096  # Allowance for Python-level bookkeeping (tuples, slices)
+
+
+def legacy_prepare(frame: np.ndarray):
+    """Preprocessing exactly as HandEffectTracker._prepare_frame did before the pool"""
+    frame = cv2.flip(frame, 1)
+    frame = cv2.resize(frame, (960, 720))
+    h, w = frame.shape[:2]
+    min_dim = min(h, w)
+    x_start, y_start = (w - min_dim) // 2, (h - min_dim) // 2
+    frame_square = frame[y_start:y_start + min_dim, x_start:x_start + min_dim]
+    return frame_square, cv2.cvtColor(frame_square, cv2.COLOR_BGR2RGB)
+
+
+def pool_prepare(pool: FrameBufferPool, frame: np.ndarray):
+    square = pool.square(frame)
+    return square, pool.to_rgb(square)
+
+
+def time_call(fn, repeats: int = REPEATS) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def traced_bytes(fn, repeats: int = 50) -> int:
+    """Peak traced memory allocated on top of the baseline while calling ``fn`` repeatedly"""
+    fn()  # Warm up lazily created buffers
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    for _ in range(repeats):
+        fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - base
+
+
+def main() -> int:
+    rng = np.random.default_rng(0)
+    failed = False
+
+    print(f"{'camera':>10} {'legacy_us':>10} {'pool_us':>10} {'speedup':>8} "
+          f"{'legacy_peak':>11} {'pool_peak':>9} {'max_diff':>8}")
+    for h, w in CAMERA_SIZES:
+        frame = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+        pool = FrameBufferPool()
+
+        legacy_square, legacy_rgb = legacy_prepare(frame)
+        square, rgb = pool_prepare(pool, frame)
+        max_diff = int(np.abs(legacy_square.astype(np.int16) - square.astype(np.int16)).max())
+
+        legacy_us = time_call(lambda: legacy_prepare(frame))
+        pool_us = time_call(lambda: pool_prepare(pool, frame))
+        legacy_bytes = traced_bytes(lambda: legacy_prepare(frame))
+        pool_bytes = traced_bytes(lambda: pool_prepare(pool, frame))
+        failed |= pool_bytes > MAX_POOL_BYTES
+
+        print(f"{f'{w}x{h}':>10} {legacy_us:>10.1f} {pool_us:>10.1f} {legacy_us / pool_us:>7.1f}x "
+              f"{legacy_bytes:>11} {pool_bytes:>9} {max_diff:>8}")
+
+    if failed:
+        print(f"FAIL: pooled preprocessing allocates more than {MAX_POOL_BYTES} bytes per frame")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""Benchmark: per-segment cv2.line trail drawing vs batched TrailRenderer
+
+Run from the repository root:
+    python benchmarks/bench_trail.py
+"""
+import math
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trail import GLOW_COLOR, SHADOW_COLORS, SHADOW_OFFSETS, TrailRenderer
+
+TRAIL_LENGTH = 30   # config['trail_max_length']
+THICKNESS = 8       # config['trail_thickness']
+REPEATS = 500
+
+
+def legacy_draw(frame: np.ndarray, trail_points) -> int:
+    """Trail drawing as _draw_finger_trail did it before TrailRenderer; returns call count"""
+    calls = 0
+    for offset_idx, (dx, dy) in enumerate(SHADOW_OFFSETS):
+        for i in range(1, len(trail_points)):
+            fade_factor = (i / len(trail_points)) * 0.8 + 0.2
+            pt1 = (trail_points[i-1][0] + dx, trail_points[i-1][1] + dy)
+            pt2 = (trail_points[i][0] + dx, trail_points[i][1] + dy)
+            thickness = max(1, int(THICKNESS * fade_factor))
+            color = tuple(int(c * fade_factor) for c in SHADOW_COLORS[offset_idx])
+            cv2.line(frame, pt1, pt2, color, thickness)
+            calls += 1
+            if offset_idx == 2:
+                cv2.line(frame, pt1, pt2, GLOW_COLOR, max(1, thickness // 2))
+                calls += 1
+    return calls
+
+
+def main():
+    # Spiral-ish fingertip path with ~10 px spacing, like a fast finger movement
+    points = [(int(360 + 8 * i * math.cos(i / 4)), int(360 + 8 * i * math.sin(i / 4)))
+              for i in range(TRAIL_LENGTH)]
+    renderer = TrailRenderer(thickness=THICKNESS)
+
+    legacy_frame = np.zeros((720, 720, 3), dtype=np.uint8)
+    batched_frame = np.zeros((720, 720, 3), dtype=np.uint8)
+    legacy_calls = legacy_draw(legacy_frame, points)
+    renderer.draw(batched_frame, points)
+    batched_calls = renderer.calls
+
+    legacy_pixels = (legacy_frame.any(axis=2))
+    batched_pixels = (batched_frame.any(axis=2))
+    coverage_iou = (legacy_pixels & batched_pixels).sum() / (legacy_pixels | batched_pixels).sum()
+    drawn = legacy_pixels & batched_pixels
+    mean_color_diff = np.abs(legacy_frame[drawn].astype(int) - batched_frame[drawn].astype(int)).mean()
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        legacy_draw(legacy_frame, points)
+    legacy_us = (time.perf_counter() - start) / REPEATS * 1e6
+
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        renderer.draw(batched_frame, points)
+    batched_us = (time.perf_counter() - start) / REPEATS * 1e6
+
+    print(f"trail length {TRAIL_LENGTH}, thickness {THICKNESS}")
+    print(f"legacy : {legacy_us:8.1f} us/frame, {legacy_calls} cv2 calls")
+    print(f"batched: {batched_us:8.1f} us/frame, {batched_calls} cv2 calls")
+    print(f"speedup {legacy_us / batched_us:.1f}x, coverage IoU {coverage_iou:.3f}, "
+          f"mean color diff {mean_color_diff:.1f}")
+
+
+if __name__ == "__main__":
+    main()
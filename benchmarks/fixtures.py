@@ -0,0 +1,134 @@
+"""Landmark fixtures for the benchmark suite
+
+A fixture is a JSON file holding per-frame hand landmarks (normalized to
+the processed square, like MediaPipe's output) plus handedness labels.
+The bundled fixtures are generated deterministically by this module:
+
+    python benchmarks/fixtures.py            # rewrite benchmarks/fixtures/*.json
+"""
+import json
+import math
+import os
+import sys
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from landmarks import HandDetections
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Right hand template in hand units, wrist at the bottom, fingers pointing up (-y)
+HAND_TEMPLATE = [
+    (0.0, 0.5), (-0.2, 0.4), (-0.35, 0.3), (-0.45, 0.15), (-0.55, 0.0),      # wrist, thumb
+    (-0.2, 0.0), (-0.22, -0.3), (-0.23, -0.5), (-0.24, -0.7),                 # index
+    (0.0, -0.05), (0.0, -0.35), (0.0, -0.55), (0.0, -0.75),                   # middle
+    (0.18, 0.0), (0.2, -0.3), (0.21, -0.5), (0.22, -0.65),                    # ring
+    (0.33, 0.05), (0.36, -0.2), (0.38, -0.35), (0.4, -0.5),                   # pinky
+]
+CURLED = {
+    'index': {8: (-0.2, 0.1)},
+    'middle': {12: (0.0, 0.1)},
+    'ring': {16: (0.2, 0.1)},
+    'pinky': {20: (0.35, 0.15)},
+    'thumb': {4: (-0.2, 0.3)},
+}
+
+
+def make_hand(cx: float, cy: float, scale: float, gesture: str = "open",
+              angle: float = 0.0) -> List[List[float]]:
+    """21 [x, y, z] landmarks for a hand centered at (cx, cy) in normalized coordinates"""
+    points = dict(enumerate(HAND_TEMPLATE))
+    if gesture == "index":
+        curled = ('middle', 'ring', 'pinky', 'thumb')
+    elif gesture == "fist":
+        curled = ('index', 'middle', 'ring', 'pinky', 'thumb')
+    else:
+        curled = ()
+    for finger in curled:
+        points.update(CURLED[finger])
+
+    cos_a, sin_a = math.cos(angle), math.sin(angle)
+    hand = []
+    for idx in range(21):
+        dx, dy = points[idx]
+        x = cx + scale * (dx * cos_a - dy * sin_a)
+        y = cy + scale * (dx * sin_a + dy * cos_a)
+        hand.append([round(x, 5), round(y, 5), round(-0.01 * idx, 5)])
+    return hand
+
+
+def _one_hand(t: int) -> Dict:
+    a = t / 12
+    return {'hands': [make_hand(0.45 + 0.12 * math.cos(a), 0.55 + 0.1 * math.sin(a), 0.16,
+                                angle=0.1 * math.sin(a))],
+            'handedness': ['Right']}
+
+
+def _two_hands(t: int) -> Dict:
+    a = t / 12
+    return {'hands': [make_hand(0.3 + 0.08 * math.cos(a), 0.55 + 0.06 * math.sin(a), 0.16),
+                      make_hand(0.7 + 0.1 * math.sin(a), 0.6 + 0.1 * math.cos(a), 0.14, "index")],
+            'handedness': ['Left', 'Right']}
+
+
+def _trail_max(t: int) -> Dict:
+    # Fast figure-eight with the index finger so the trail stays at full length
+    a = t / 6
+    return {'hands': [make_hand(0.5 + 0.25 * math.sin(a), 0.55 + 0.15 * math.sin(2 * a), 0.15, "index")],
+            'handedness': ['Right']}
+
+
+def _large_effect(t: int) -> Dict:
+    # Hand close to the camera: effect size saturates at max_effect_size
+    a = t / 15
+    return {'hands': [make_hand(0.5 + 0.05 * math.cos(a), 0.6, 0.38),
+                      make_hand(0.5 + 0.05 * math.sin(a), 0.35, 0.3, "index")],
+            'handedness': ['Right', 'Left']}
+
+
+GENERATORS = {
+    'one_hand': _one_hand,
+    'two_hands': _two_hands,
+    'trail_max': _trail_max,
+    'large_effect': _large_effect,
+}
+
+
+def generate_fixture(name: str, frames: int = 120) -> Dict:
+    return {
+        'name': name,
+        'frame_size': [480, 640],  # Camera frame (height, width) fed to process_frame
+        'frames': [GENERATORS[name](t) for t in range(frames)],
+    }
+
+
+def save_fixture(fixture: Dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(fixture, f, separators=(",", ":"))
+
+
+def load_fixture(path: str) -> Dict:
+    """Load a fixture; frames become HandDetections with (n, 21, 3) float32 arrays"""
+    with open(path) as f:
+        fixture = json.load(f)
+    fixture['frames'] = [
+        HandDetections(np.asarray(frame['hands'], dtype=np.float32).reshape(-1, 21, 3)
+                       if frame['hands'] else None,
+                       frame.get('handedness'))
+        for frame in fixture['frames']
+    ]
+    return fixture
+
+
+def fixture_path(name: str) -> str:
+    return os.path.join(FIXTURE_DIR, f"{name}.json")
+
+
+if __name__ == "__main__":
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for fixture_name in GENERATORS:
+        save_fixture(generate_fixture(fixture_name), fixture_path(fixture_name))
+        print(f"Wrote {fixture_path(fixture_name)}")
@@ -0,0 +1,218 @@
+"""Reproducible benchmark suite for HandEffectTracker
+
+Replays recorded landmark fixtures through the tracker with MediaPipe
+replaced by a fixture player, so it runs on a CPU-only box without a
+camera. Reports throughput, latency percentiles and peak Python memory
+per scenario as JSON:
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --compare baseline.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+import cv2
+import numpy as np
+
+from fixtures import fixture_path, load_fixture
+from main import HandEffectTracker
+
+EFFECT_NAME = "efek-api-unscreen"
+
+
+class FixturePlayer:
+    """Stands in for mediapipe Hands: returns the fixture's detections in order"""
+
+    def __init__(self, frames: List):
+        self.frames = frames
+        self.index = 0
+
+    def process(self, rgb: np.ndarray):
+        detections = self.frames[self.index % len(self.frames)]
+        self.index += 1
+        return detections
+
+    def close(self) -> None:
+        pass
+
+
+def make_tracker(fixture: Dict) -> HandEffectTracker:
+    # Fixture detections stand in for MediaPipe, so the suite needs neither it nor its model
+    return HandEffectTracker(os.path.join(REPO_ROOT, "effects"), hands=FixturePlayer(fixture['frames']))
+
+
+def camera_frame(fixture: Dict) -> np.ndarray:
+    """Deterministic textured stand-in for a camera frame"""
+    h, w = fixture['frame_size']
+    return np.random.default_rng(0).integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+
+def measure(fn: Callable[[int], None], iterations: int, warmup: int) -> Dict[str, float]:
+    """Time ``fn(i)`` per iteration, then rerun under tracemalloc for peak memory"""
+    for i in range(warmup):
+        fn(i)
+
+    samples = np.empty(iterations)
+    start = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(warmup + i)
+        samples[i] = time.perf_counter() - t0
+    elapsed = time.perf_counter() - start
+
+    # Separate pass: tracemalloc slows allocation-heavy code down noticeably
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    for i in range(min(iterations, 50)):
+        fn(warmup + iterations + i)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ms = samples * 1000
+    return {
+        'iterations': iterations,
+        'throughput_per_s': iterations / elapsed,
+        'mean_ms': float(ms.mean()),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99)),
+        'max_ms': float(ms.max()),
+        'peak_alloc_kb': (peak - base) / 1024,
+    }
+
+
+def bench_process_frame(fixture_name: str, iterations: int, warmup: int) -> Dict:
+    fixture = load_fixture(fixture_path(fixture_name))
+    tracker = make_tracker(fixture)
+    frame = camera_frame(fixture)
+    return measure(lambda i: tracker.process_frame(frame), iterations, warmup)
+
+
+def bench_update_hand_state(fixture_name: str, iterations: int, warmup: int) -> Dict:
+    fixture = load_fixture(fixture_path(fixture_name))
+    tracker = make_tracker(fixture)
+    frames = [f.multi_hand_landmarks for f in fixture['frames']]
+
+    def step(i: int) -> None:
+        points = frames[i % len(frames)]
+        for hand_idx, landmarks in enumerate(points):
+            tracker._update_hand_state(hand_idx, landmarks, (720, 960))
+
+    return measure(step, iterations, warmup)
+
+
+def bench_overlay(size: int, iterations: int, warmup: int) -> Dict:
+    fixture = load_fixture(fixture_path('large_effect'))
+    tracker = make_tracker(fixture)
+    effect_frames = tracker.atlas.frames(EFFECT_NAME)
+    base = np.ascontiguousarray(camera_frame(fixture)[:, :480])
+    canvas = np.zeros((720, 720, 3), dtype=np.uint8)
+    canvas[:480, :480] = base
+
+    def step(i: int) -> None:
+        frame_index = i % len(effect_frames)
+        tracker._overlay_effect_optimized(canvas, effect_frames[frame_index], 360, 300, size,
+                                          effect_key=(EFFECT_NAME, frame_index))
+
+    return measure(step, iterations, warmup)
+
+
+def bench_trail(iterations: int, warmup: int) -> Dict:
+    fixture = load_fixture(fixture_path('trail_max'))
+    tracker = make_tracker(fixture)
+    length = tracker.config['trail_max_length']
+    rng = np.random.default_rng(1)
+    trail = [tuple(int(v) for v in p) for p in np.cumsum(rng.integers(-12, 13, (length, 2)), axis=0) + 360]
+    canvas = np.zeros((720, 720, 3), dtype=np.uint8)
+    return measure(lambda i: tracker._draw_finger_trail(canvas, trail), iterations, warmup)
+
+
+def scenarios(iterations: int, warmup: int) -> Dict[str, Callable[[], Dict]]:
+    return {
+        'process_frame/one_hand': lambda: bench_process_frame('one_hand', iterations, warmup),
+        'process_frame/two_hands': lambda: bench_process_frame('two_hands', iterations, warmup),
+        'process_frame/trail_max': lambda: bench_process_frame('trail_max', iterations, warmup),
+        'process_frame/large_effect': lambda: bench_process_frame('large_effect', iterations, warmup),
+        'update_hand_state/two_hands': lambda: bench_update_hand_state('two_hands', iterations, warmup),
+        'overlay/size_120': lambda: bench_overlay(120, iterations, warmup),
+        'overlay/size_400': lambda: bench_overlay(400, iterations, warmup),
+        'draw_finger_trail/max_length': lambda: bench_trail(iterations, warmup),
+    }
+
+
+def environment() -> Dict[str, Optional[str]]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+    }
+
+
+def print_comparison(results: Dict, baseline: Dict) -> None:
+    print(f"{'scenario':<32} {'base p50':>9} {'new p50':>9} {'ratio':>7} {'base/s':>9} {'new/s':>9}")
+    for name, new in results['scenarios'].items():
+        old = baseline.get('scenarios', {}).get(name)
+        if old is None:
+            print(f"{name:<32} {'-':>9} {new['p50_ms']:>9.3f}")
+            continue
+        ratio = new['p50_ms'] / old['p50_ms'] if old['p50_ms'] else float('inf')
+        print(f"{name:<32} {old['p50_ms']:>9.3f} {new['p50_ms']:>9.3f} {ratio:>6.2f}x "
+              f"{old['throughput_per_s']:>9.1f} {new['throughput_per_s']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HandEffectTracker benchmark suite")
+    parser.add_argument("--iterations", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--filter", default=None, help="Only run scenarios containing this text")
+    parser.add_argument("--output", default=None, help="Write JSON results to this file")
+    parser.add_argument("--compare", default=None, help="Baseline JSON results to compare against")
+    args = parser.parse_args()
+
+    results = {'environment': environment(), 'scenarios': {}}
+    for name, run in scenarios(args.iterations, args.warmup).items():
+        if args.filter and args.filter not in name:
+            continue
+        # Keep stdout clean for JSON: tracker start-up messages go to stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            results['scenarios'][name] = run()
+        stats = results['scenarios'][name]
+        print(f"{name:<32} p50 {stats['p50_ms']:7.3f} ms  p95 {stats['p95_ms']:7.3f}  "
+              f"p99 {stats['p99_ms']:7.3f}  {stats['throughput_per_s']:8.1f}/s  "
+              f"peak {stats['peak_alloc_kb']:8.1f} KiB", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import cv2
+import numpy as np
+from typing import Optional
+
+
+class PremultipliedSprite:
+    """Effect frame stored as premultiplied color plus inverse alpha"""
+
+    __slots__ = ('color', 'inv_alpha', 'offset')
+
+    def __init__(self, color: np.ndarray, inv_alpha: Optional[np.ndarray]):
+        self.color = color            # color * alpha / 255, uint8 (h, w, 3)
+        self.inv_alpha = inv_alpha    # 255 - alpha replicated to 3 channels, None if opaque
+        self.offset = (0, 0)          # (x, y) of this sprite within the full effect square
+
+    @property
+    def shape(self):
+        return self.color.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.color.nbytes + (self.inv_alpha.nbytes if self.inv_alpha is not None else 0)
+
+
+def premultiply(frame: np.ndarray) -> PremultipliedSprite:
+    """Convert an RGB/RGBA effect frame into a premultiplied sprite"""
+    if frame.ndim != 3 or frame.shape[2] != 4:
+        return PremultipliedSprite(np.ascontiguousarray(frame[:, :, :3]), None)
+
+    alpha = cv2.merge([frame[:, :, 3]] * 3)
+    color = cv2.multiply(np.ascontiguousarray(frame[:, :, :3]), alpha, scale=1.0 / 255.0)
+    inv_alpha = cv2.subtract(np.full_like(alpha, 255), alpha)
+    return PremultipliedSprite(color, inv_alpha)
+
+
+class AlphaCompositor:
+    """In-place premultiplied "over" blending with one reusable scratch buffer"""
+
+    def __init__(self, max_size: int = 400):
+        self._scratch = np.empty(max_size * max_size * 3, dtype=np.uint8)
+
+    def _scratch_view(self, shape) -> np.ndarray:
+        needed = shape[0] * shape[1] * 3
+        if needed > self._scratch.size:
+            self._scratch = np.empty(needed, dtype=np.uint8)
+        return self._scratch[:needed].reshape(shape[0], shape[1], 3)
+
+    def blend(self, roi: np.ndarray, color: np.ndarray, inv_alpha: Optional[np.ndarray]) -> None:
+        """Blend a premultiplied sprite region onto ``roi`` in place
+
+        roi = color + roi * inv_alpha / 255, computed in saturating uint8
+        arithmetic by OpenCV so no full-size temporaries are allocated.
+        """
+        if inv_alpha is None:
+            roi[...] = color
+            return
+
+        scratch = self._scratch_view(roi.shape)
+        cv2.multiply(roi, inv_alpha, dst=scratch, scale=1.0 / 255.0)
+        cv2.add(scratch, color, dst=roi)
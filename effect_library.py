@@ -0,0 +1,198 @@
+import cv2
+import numpy as np
+import imageio
+import hashlib
+import os
+import threading
+import collections.abc
+from typing import Dict, Iterator, List, Optional
+
+
+def default_cache_dir() -> str:
+    """Per-user cache directory for decoded effect frames ($XDG_CACHE_HOME/hand-effects)"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'hand-effects')
+
+
+class FrameStack:
+    """All frames of one effect in a single contiguous (n, h, w, 4) RGBA array
+
+    The array may be a read-only memory map of the on-disk frame cache, in
+    which case pages are only brought into memory when frames are used.
+    """
+
+    def __init__(self, frames: np.ndarray):
+        self.frames = frames
+
+    def __len__(self) -> int:
+        return self.frames.shape[0]
+
+    def __getitem__(self, index: int) -> np.ndarray:
+        return self.frames[index]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        return iter(self.frames)
+
+    @property
+    def nbytes(self) -> int:
+        return self.frames.nbytes
+
+
+class EffectLibrary(collections.abc.Mapping):
+    """GIF effects in a folder, decoded on first use
+
+    Effect names are discovered up front (a directory listing), but a GIF is
+    only decoded when its entry is first accessed. Decoding streams frames
+    straight into a ``.npy`` file in ``cache_dir`` (a per-user cache
+    directory by default), which later runs open as a memory map instead of
+    decoding the GIF again. Decoded frames are far larger than the GIFs, so
+    an effect whose cache would push the directory past ``max_cache_bytes``
+    is decoded into memory only.
+    """
+
+    def __init__(self, folder_path: str, flip_horizontal: bool = True, use_cache: bool = True,
+                 cache_dir: Optional[str] = None, max_cache_bytes: int = 512 * 1024 * 1024):
+        self.folder_path = folder_path
+        self.flip_horizontal = flip_horizontal
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_cache_bytes = max_cache_bytes
+        self._paths: Dict[str, str] = {}
+        self._loaded: Dict[str, Dict] = {}
+        self._lock = threading.Lock()     # One decode at a time when shared between threads
+
+        if not os.path.exists(folder_path):
+            print(f"Warning: Effects directory not found: {folder_path}")
+            return
+
+        for filename in sorted(os.listdir(folder_path)):
+            if filename.lower().endswith('.gif'):
+                self._paths[os.path.splitext(filename)[0]] = os.path.join(folder_path, filename)
+
+    def __getitem__(self, name: str) -> Dict:
+        effect = self._loaded.get(name)
+        if effect is not None:
+            return effect
+
+        with self._lock:
+            effect = self._loaded.get(name)
+            if effect is None:
+                if name not in self._paths:
+                    raise KeyError(name)
+                try:
+                    effect = self._load(name)
+                except Exception as e:
+                    # Forget broken effects so they are reported (and retried) only once
+                    print(f"Error loading {os.path.basename(self._paths.pop(name))}: {e}")
+                    raise KeyError(name) from e
+                self._loaded[name] = effect
+        return effect
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+    def __contains__(self, name) -> bool:
+        return name in self._paths
+
+    @property
+    def loaded(self) -> List[str]:
+        """Names of effects that have been decoded so far"""
+        return list(self._loaded)
+
+    def cache_path(self, name: str) -> str:
+        """Cache file of an effect; keyed by the GIF's absolute path so folders don't collide"""
+        gif_path = os.path.abspath(self._paths[name])
+        digest = hashlib.sha1(gif_path.encode()).hexdigest()[:10]
+        suffix = ".flipped.npy" if self.flip_horizontal else ".npy"
+        return os.path.join(self.cache_dir, f"{name}-{digest}{suffix}")
+
+    def _cache_room(self, cache_path: str, size: int) -> bool:
+        """True if a ``size`` byte cache file fits the budget (replacing ``cache_path``)"""
+        used = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.path != cache_path:
+                used += entry.stat().st_size
+        return used + size <= self.max_cache_bytes
+
+    def _load(self, name: str) -> Dict:
+        gif_path = self._paths[name]
+        cache_path = self.cache_path(name)
+        source = "cache"
+
+        frames = None
+        if self.use_cache and os.path.exists(cache_path) and \
+                os.path.getmtime(cache_path) >= os.path.getmtime(gif_path):
+            try:
+                frames = np.load(cache_path, mmap_mode='r')
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable frame cache {cache_path}: {e}")
+
+        if frames is None:
+            frames = self._decode(gif_path, cache_path if self.use_cache else None)
+            source = "gif"
+
+        print(f"Loaded effect '{name}' with {len(frames)} frames (from {source})")
+        return {
+            "type": "gif",
+            "frames": FrameStack(frames),
+            "frame_count": len(frames)
+        }
+
+    def _decode(self, gif_path: str, cache_path: Optional[str]) -> np.ndarray:
+        """Stream GIF frames into one RGBA array, written to ``cache_path`` if given"""
+        reader = imageio.get_reader(gif_path)
+        tmp_path = None
+        try:
+            frame_count = reader.get_length()
+            if frame_count == float('inf'):
+                frame_count = sum(1 for _ in reader)  # Length unknown up front: count first
+            first = np.asarray(reader.get_data(0))
+            shape = (frame_count, first.shape[0], first.shape[1], 4)
+
+            frames = None
+            if cache_path is not None:
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                try:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    size = int(np.prod(shape))
+                    if self._cache_room(cache_path, size):
+                        frames = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint8,
+                                                           shape=shape)
+                    else:
+                        print(f"Not caching {os.path.basename(gif_path)}: {size >> 20} MB of frames "
+                              f"would exceed the {self.max_cache_bytes >> 20} MB cache budget "
+                              f"in {self.cache_dir}")
+                        tmp_path = None
+                except OSError as e:
+                    print(f"Cannot write frame cache {cache_path}: {e}")
+                    tmp_path = None
+            if frames is None:
+                frames = np.empty(shape, dtype=np.uint8)
+
+            for index in range(frame_count):
+                frame = np.asarray(reader.get_data(index))
+                if frame.shape[2] == 3:
+                    # GIF frames without transparency become fully opaque RGBA
+                    frame = cv2.cvtColor(frame, cv2.COLOR_RGB2RGBA)
+                if self.flip_horizontal:
+                    cv2.flip(frame, 1, dst=frames[index])
+                else:
+                    frames[index] = frame
+        except Exception:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            reader.close()
+
+        if tmp_path is None:
+            return frames
+
+        # Publish the finished cache atomically, then reopen it read-only
+        frames.flush()
+        del frames
+        os.replace(tmp_path, cache_path)
+        return np.load(cache_path, mmap_mode='r')
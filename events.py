@@ -0,0 +1,306 @@
+"""Asyncio publish/subscribe API for hand tracking signals
+
+The tracker publishes once per frame from whatever thread runs it; events
+are delivered on the subscriber's event loop::
+
+    bus = HandEventBus()
+    tracker.event_bus = bus
+
+    async with bus.subscribe({GestureChanged, HandPosition}) as events:
+        async for event in events:
+            ...
+
+Run headless (no drawing, no window) and print events as JSON lines:
+
+    python events.py --source 0
+"""
+import argparse
+import asyncio
+import collections
+import json
+import threading
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+Point = Tuple[float, float]
+
+
+class GestureChanged(NamedTuple):
+    hand_id: int
+    gesture: str                     # 'fist', 'open_hand' or 'single_<finger>'
+    previous: Optional[str]          # None when the hand first appears
+    frame: int
+    timestamp: float
+
+
+class HandPosition(NamedTuple):
+    hand_id: int
+    x: float                         # Smoothed palm position, normalized to the processed square
+    y: float
+    size: float                      # Smoothed effect size, normalized
+    gesture: str
+    fingertip: Optional[Point]       # Normalized fingertip for single-finger gestures
+    frame: int
+    timestamp: float
+
+
+class TrailUpdated(NamedTuple):
+    hand_id: int
+    finger: str
+    points: Tuple[Point, ...]        # Whole trail, oldest point first, normalized
+    frame: int
+    timestamp: float
+
+
+class HandLost(NamedTuple):
+    hand_id: int
+    frame: int
+    timestamp: float
+
+
+EVENT_TYPES = (GestureChanged, HandPosition, TrailUpdated, HandLost)
+
+# Only the newest of these matters, so a pending one is replaced instead of queued
+COALESCED_TYPES = (HandPosition, TrailUpdated)
+
+
+class Subscription:
+    """Bounded event queue of one subscriber, read with ``await get()`` or ``async for``
+
+    Position and trail events are coalesced per hand: a newer one replaces
+    the pending one in place. When the queue is full the oldest event is
+    dropped, so a slow consumer never holds the tracker back.
+    """
+
+    def __init__(self, bus: "HandEventBus", kinds: Optional[Iterable[type]], maxsize: int):
+        self.bus = bus
+        self.kinds = tuple(kinds) if kinds else EVENT_TYPES
+        self.maxsize = max(1, maxsize)
+        self.dropped = 0
+        self.coalesced = 0
+
+        self._items = collections.deque()      # [event, coalescing key or None] entries
+        self._pending: Dict[Tuple[type, int], List] = {}
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    async def get(self):
+        """Next event; raises StopAsyncIteration once the subscription is closed"""
+        while not self._items:
+            if self._closed:
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        event, key = self._items.popleft()
+        if key is not None:
+            del self._pending[key]
+        return event
+
+    def close(self) -> None:
+        self._closed = True
+        self._ready.set()
+        self.bus._unsubscribe(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+    async def __aenter__(self) -> "Subscription":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def _push(self, event) -> None:
+        """Queue an event (event-loop thread only)"""
+        if not isinstance(event, self.kinds):
+            return
+        key = (type(event), event.hand_id) if isinstance(event, COALESCED_TYPES) else None
+        if key is not None and key in self._pending:
+            self._pending[key][0] = event
+            self.coalesced += 1
+            return
+
+        if len(self._items) >= self.maxsize:
+            _, dropped_key = self._items.popleft()
+            if dropped_key is not None:
+                del self._pending[dropped_key]
+            self.dropped += 1
+        entry = [event, key]
+        if key is not None:
+            self._pending[key] = entry
+        self._items.append(entry)
+        self._ready.set()
+
+
+class HandEventBus:
+    """Turns per-frame hand states into events and fans them out to subscribers
+
+    ``publish_frame`` is called by the tracker thread; it does nothing
+    while there are no subscribers and otherwise hands the frame's events
+    to the subscribers' loop with a single ``call_soon_threadsafe``.
+    """
+
+    def __init__(self):
+        self._subscribers: List[Subscription] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+        # Last published gesture / trail per hand (tracker thread only)
+        self._gestures: Dict[int, str] = {}
+        self._trails: Dict[int, Tuple[int, Optional[Tuple[int, int]]]] = {}
+        self.published = 0
+
+    @property
+    def active(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self, kinds: Optional[Iterable[type]] = None, maxsize: int = 64) -> Subscription:
+        """New subscription for the given event types (all by default); call from the event loop"""
+        subscription = Subscription(self, kinds, maxsize)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscribers = self._subscribers + [subscription]
+        return subscription
+
+    def publish(self, events: Sequence) -> None:
+        """Deliver events to every subscriber; safe to call from any thread"""
+        loop = self._loop
+        if not events or loop is None or not self._subscribers or loop.is_closed():
+            return
+        self.published += len(events)
+        try:
+            loop.call_soon_threadsafe(self._dispatch, events)
+        except RuntimeError:
+            pass  # Loop shut down between the check and the call
+
+    def publish_frame(self, frame: int, hand_states: Dict[int, Dict], hand_ids: Sequence[int],
+                      evicted: Sequence[int], frame_size: int) -> None:
+        """Diff the tracker's hand states against the last frame and publish the changes"""
+        if not self._subscribers:
+            return
+        now = time.time()
+        scale = 1.0 / frame_size
+        events = []
+        for hand_id in evicted:
+            self._gestures.pop(hand_id, None)
+            self._trails.pop(hand_id, None)
+            events.append(HandLost(hand_id, frame, now))
+
+        for hand_id in hand_ids:
+            state = hand_states.get(hand_id)
+            if state is None:
+                continue
+            gesture = state['current_gesture']
+            previous = self._gestures.get(hand_id)
+            if gesture != previous:
+                self._gestures[hand_id] = gesture
+                events.append(GestureChanged(hand_id, gesture, previous, frame, now))
+
+            if state['smooth_x'] is not None:
+                fingertip = state['finger_position']
+                events.append(HandPosition(
+                    hand_id, state['smooth_x'] * scale, state['smooth_y'] * scale,
+                    (state['smooth_size'] or 0) * scale, gesture,
+                    (fingertip[0] * scale, fingertip[1] * scale) if fingertip else None,
+                    frame, now))
+
+            trail = state['trail_points']
+            signature = (len(trail), trail[-1] if trail else None)
+            if trail and signature != self._trails.get(hand_id):
+                events.append(TrailUpdated(
+                    hand_id, (state['last_trail_finger'] or gesture).replace('single_', ''),
+                    tuple((x * scale, y * scale) for x, y in trail), frame, now))
+            self._trails[hand_id] = signature
+
+        self.publish(events)
+
+    def _dispatch(self, events: Sequence) -> None:
+        for subscription in self._subscribers:
+            for event in events:
+                subscription._push(event)
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers = [s for s in self._subscribers if s is not subscription]
+
+
+async def run_headless(tracker, source, bus: HandEventBus,
+                       stop: Optional[threading.Event] = None) -> int:
+    """Track ``source`` on a worker thread with rendering disabled, publishing to ``bus``
+
+    Returns the number of processed frames once the source ends or ``stop`` is set.
+    """
+    from stream_server import open_source
+
+    tracker.config['headless'] = True
+    tracker.event_bus = bus
+    stop = stop or threading.Event()
+    cap = open_source(source)
+
+    def track() -> int:
+        frames = 0
+        try:
+            while not stop.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                tracker.process_frame(frame)
+                frames += 1
+        finally:
+            cap.release()
+        return frames
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(None, track)
+    finally:
+        stop.set()
+
+
+async def _print_events(source, kinds: Optional[List[type]], tracker) -> None:
+    bus = HandEventBus()
+    subscription = bus.subscribe(kinds)
+    tracking = asyncio.ensure_future(run_headless(tracker, source, bus))
+    tracking.add_done_callback(lambda _: subscription.close())
+    async for event in subscription:
+        print(json.dumps({'type': type(event).__name__, **event._asdict()}), flush=True)
+    frames = await tracking
+    print(f"Processed {frames} frames, published {bus.published} events, "
+          f"dropped {subscription.dropped}, coalesced {subscription.coalesced}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print hand tracking events as JSON lines")
+    parser.add_argument("--source", default="0",
+                        help="Camera index, video file or synthetic[:WxH] (default: 0)")
+    parser.add_argument("--events", default=None,
+                        help="Comma separated event types, e.g. GestureChanged,HandPosition")
+    parser.add_argument("--detect-every", type=int, default=1, metavar="N",
+                        help="Run hand detection every N frames and extrapolate in between")
+    args = parser.parse_args()
+
+    names = {kind.__name__: kind for kind in EVENT_TYPES}
+    kinds = None
+    if args.events:
+        unknown = [name for name in args.events.split(",") if name not in names]
+        if unknown:
+            parser.error(f"Unknown event type(s): {', '.join(unknown)}")
+        kinds = [names[name] for name in args.events.split(",")]
+
+    from main import HandEffectTracker
+    tracker = HandEffectTracker()
+    tracker.extrapolator.interval = args.detect_every
+    source = int(args.source) if args.source.isdigit() else args.source
+    try:
+        asyncio.run(_print_events(source, kinds, tracker))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from typing import Dict, List, Optional, Sequence
+
+
+class HandTrack:
+    """One tracked hand identity and its motion estimate"""
+
+    __slots__ = ('id', 'label', 'position', 'velocity', 'missed', 'hits')
+
+    def __init__(self, track_id: int, position: np.ndarray, label: Optional[str]):
+        self.id = track_id
+        self.label = label
+        self.position = position              # Last palm center, normalized (x, y)
+        self.velocity = np.zeros(2)           # Per-frame displacement
+        self.missed = 0                       # Consecutive frames without a detection
+        self.hits = 1
+
+    def predict(self) -> np.ndarray:
+        """Expected position this frame, extrapolated over any missed frames"""
+        return self.position + self.velocity * (self.missed + 1)
+
+
+class HandIdentityTracker:
+    """Keeps hand identities stable across frames
+
+    Detections are matched to existing tracks with a Hungarian assignment on
+    the distance between detected palm centers and each track's
+    constant-velocity prediction, plus a penalty when MediaPipe's handedness
+    label disagrees. Unmatched tracks survive ``grace_frames`` frames before
+    they are evicted, so a hand that briefly drops out keeps its state.
+    """
+
+    def __init__(self, max_distance: float = 0.2, grace_frames: int = 10,
+                 handedness_penalty: float = 0.1, velocity_smoothing: float = 0.5):
+        self.max_distance = max_distance                # Normalized units; farther = new hand
+        self.grace_frames = grace_frames
+        self.handedness_penalty = handedness_penalty
+        self.velocity_smoothing = velocity_smoothing
+
+        self.tracks: Dict[int, HandTrack] = {}
+        self.evicted: List[int] = []                    # Track ids evicted by the last assign()
+        self._next_id = 0
+
+    def reset(self) -> None:
+        self.evicted = list(self.tracks)
+        self.tracks.clear()
+
+    def assign(self, centers: np.ndarray, labels: Sequence[Optional[str]]) -> List[int]:
+        """Return a track id for each detected palm center (n, 2), in detection order"""
+        track_list = list(self.tracks.values())
+        assigned: List[Optional[int]] = [None] * len(centers)
+
+        if track_list and len(centers):
+            predicted = np.array([track.predict() for track in track_list])
+            cost = np.linalg.norm(centers[:, np.newaxis, :2] - predicted[np.newaxis], axis=2)
+            for det_idx, label in enumerate(labels):
+                for trk_idx, track in enumerate(track_list):
+                    if label is not None and track.label is not None and label != track.label:
+                        cost[det_idx, trk_idx] += self.handedness_penalty
+
+            for det_idx, trk_idx in zip(*linear_sum_assignment(cost)):
+                if cost[det_idx, trk_idx] <= self.max_distance:
+                    assigned[det_idx] = track_list[trk_idx].id
+
+        matched = set()
+        for det_idx, track_id in enumerate(assigned):
+            position = np.asarray(centers[det_idx][:2], dtype=np.float64)
+            label = labels[det_idx] if det_idx < len(labels) else None
+            if track_id is None:
+                track_id = self._next_id
+                self._next_id += 1
+                self.tracks[track_id] = HandTrack(track_id, position, label)
+                assigned[det_idx] = track_id
+            else:
+                self._update(self.tracks[track_id], position, label)
+            matched.add(track_id)
+
+        # Age unmatched tracks and evict the ones past their grace period
+        self.evicted = []
+        for track_id, track in list(self.tracks.items()):
+            if track_id in matched:
+                continue
+            track.missed += 1
+            if track.missed > self.grace_frames:
+                del self.tracks[track_id]
+                self.evicted.append(track_id)
+
+        return assigned
+
+    def _update(self, track: HandTrack, position: np.ndarray, label: Optional[str]) -> None:
+        step = (position - track.position) / (track.missed + 1)
+        s = self.velocity_smoothing
+        track.velocity = s * step + (1 - s) * track.velocity
+        track.position = position
+        track.missed = 0
+        track.hits += 1
+        if label is not None:
+            track.label = label
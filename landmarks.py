@@ -0,0 +1,113 @@
+import numpy as np
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+NUM_LANDMARKS = 21
+
+# Finger landmark indices, ordered thumb -> pinky
+FINGER_NAMES = ('thumb', 'index', 'middle', 'ring', 'pinky')
+FINGER_TIPS = np.array([4, 8, 12, 16, 20])
+FINGER_PIPS = np.array([3, 6, 10, 14, 18])
+FINGER_MCPS = np.array([2, 5, 9, 13, 17])
+
+PALM_LANDMARKS = np.array([0, 5, 9, 13, 17])  # More stable landmarks
+
+# Hand size = weighted sum of (wrist->middle tip, index MCP->pinky MCP, wrist->thumb tip)
+SIZE_PAIRS_FROM = np.array([0, 5, 0])
+SIZE_PAIRS_TO = np.array([12, 17, 4])
+SIZE_WEIGHTS = np.array([0.6, 1.8, 0.4])
+
+THUMB_EXTENDED_THRESHOLD = 0.04
+
+
+class HandMeasurements(NamedTuple):
+    """Per-hand values derived from one (21, 3) landmark array"""
+    gesture: str
+    finger_position: Optional[Tuple[float, float]]
+    palm_center: Tuple[float, float, float]
+    hand_size: float
+
+
+class HandDetections(NamedTuple):
+    """Detection results in the shape of MediaPipe's output, with array landmarks"""
+    multi_hand_landmarks: Optional[np.ndarray]   # (n, 21, 3) normalized landmarks
+    multi_handedness: Optional[Sequence] = None
+
+
+def landmarks_to_array(hands: Optional[Sequence]) -> np.ndarray:
+    """Convert MediaPipe hand landmark lists into an (n, 21, 3) float32 array
+
+    Accepts ``results.multi_hand_landmarks`` (objects with a ``landmark``
+    field), plain sequences of landmarks or an existing array.
+    """
+    if hands is None or len(hands) == 0:
+        return np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32)
+    if isinstance(hands, np.ndarray):
+        return hands.astype(np.float32, copy=False)
+    return np.array([[(lm.x, lm.y, lm.z) for lm in getattr(hand, 'landmark', hand)]
+                     for hand in hands], dtype=np.float32)
+
+
+def handedness_labels(multi_handedness: Optional[Sequence], count: int) -> List[Optional[str]]:
+    """'Left'/'Right' label per hand from MediaPipe classifications or plain strings"""
+    labels = []
+    for hand_idx in range(count):
+        if not multi_handedness or hand_idx >= len(multi_handedness):
+            labels.append(None)
+        elif isinstance(multi_handedness[hand_idx], str):
+            labels.append(multi_handedness[hand_idx])
+        else:
+            labels.append(multi_handedness[hand_idx].classification[0].label)
+    return labels
+
+
+def extended_fingers(points: np.ndarray) -> np.ndarray:
+    """Boolean (n, 5) mask of extended fingers, thumb first"""
+    tips = points[:, FINGER_TIPS]
+    pips = points[:, FINGER_PIPS]
+    mcps = points[:, FINGER_MCPS]
+
+    # Other fingers: tip should be above pip and mcp
+    extended = (tips[:, :, 1] < pips[:, :, 1]) & (tips[:, :, 1] < mcps[:, :, 1])
+    # Thumb: check horizontal distance (special case)
+    extended[:, 0] = np.abs(tips[:, 0, 0] - mcps[:, 0, 0]) > THUMB_EXTENDED_THRESHOLD
+    return extended
+
+
+def classify_gestures(points: np.ndarray) -> List[Tuple[str, Optional[Tuple[float, float]]]]:
+    """Gesture name and single-finger tip position for each hand in the batch"""
+    extended = extended_fingers(points)
+    counts = extended.sum(axis=1)
+
+    gestures = []
+    for hand_idx, count in enumerate(counts):
+        if count == 0:
+            gestures.append(("fist", None))
+        elif count == 1:
+            finger = int(np.argmax(extended[hand_idx]))
+            tip = points[hand_idx, FINGER_TIPS[finger]]
+            gestures.append((f"single_{FINGER_NAMES[finger]}", (float(tip[0]), float(tip[1]))))
+        else:
+            gestures.append(("open_hand", None))
+    return gestures
+
+
+def palm_centers(points: np.ndarray) -> np.ndarray:
+    """(n, 3) mean position of the palm landmarks"""
+    return points[:, PALM_LANDMARKS].mean(axis=1, dtype=np.float64)
+
+
+def hand_sizes(points: np.ndarray, min_dim: int) -> np.ndarray:
+    """(n,) hand size in pixels from key landmark distances"""
+    # Accumulate in float64 so pixel rounding matches scalar Python math
+    spans = (points[:, SIZE_PAIRS_TO, :2].astype(np.float64) -
+             points[:, SIZE_PAIRS_FROM, :2].astype(np.float64))
+    return np.sqrt((spans ** 2).sum(axis=2)) @ SIZE_WEIGHTS * min_dim
+
+
+def measure_hands(points: np.ndarray, min_dim: int) -> List[HandMeasurements]:
+    """Gesture, palm center and size for every hand in one batched pass"""
+    gestures = classify_gestures(points)
+    centers = palm_centers(points)
+    sizes = hand_sizes(points, min_dim)
+    return [HandMeasurements(gesture, finger_pos, tuple(float(c) for c in center), float(size))
+            for (gesture, finger_pos), center, size in zip(gestures, centers, sizes)]
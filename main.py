@@ -1,27 +1,42 @@
+import argparse
 import cv2
-import mediapipe as mp
 import numpy as np
-import imageio
-import os
 import math
+import time
 import collections
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
+
+from compositing import AlphaCompositor
+from effect_library import EffectLibrary
+from events import HandEventBus
+from hand_identity import HandIdentityTracker
+from landmarks import (HandMeasurements, classify_gestures, hand_sizes, handedness_labels,
+                       landmarks_to_array, measure_hands, palm_centers)
+from motion import LandmarkExtrapolator
+from overlay import OverlayLayer
+from pipeline import FramePipeline
+from preprocess import FrameBufferPool
+from quality import DEFAULT_TIERS, QualityGovernor, QualityTier
+from roi_tracking import HandRoiTracker
+from session_log import SessionRecorder
+from sinks import EncoderSink, FrameSink, SharedMemorySink
+from trail import TrailRenderer
+from sprite_atlas import AtlasFrame, SpriteAtlas, scale_sprite
+from sprite_cache import EffectSpriteCache
+from telemetry import FrameProfiler
 
 class HandEffectTracker:
-    def __init__(self, effects_folder: str = "effects"):
-        # Initialize MediaPipe with optimized settings
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=2,
-            min_detection_confidence=0.7,
-            min_tracking_confidence=0.5,  # Lower tracking confidence for better performance
-            model_complexity=1  # Use simpler model for better FPS
-        )
+    def __init__(self, effects_folder: str = "effects", hands=None):
+        # Initialize MediaPipe with optimized settings, unless ``hands`` brings a stand-in
+        # detector (anything with MediaPipe Hands' process/close, e.g. recorded detections)
+        self._owns_hands = hands is None
+        if hands is None:
+            hands = self._create_hands(model_complexity=1)  # Use simpler model for better FPS
+        self.hands = hands
         
-        # Load effects once at initialization
-        self.effects = self._load_effects(effects_folder)
         self.hand_states = {}
+        self.hand_points = landmarks_to_array([])
+        self.hand_ids = []
         self.frame_count = 0
         
         # Optimized configuration
@@ -38,138 +53,183 @@ class HandEffectTracker:
             'stability_threshold': 15,   # Minimum movement to update position
             'finger_effect_size': 80,    # Size for single finger effects
             'finger_size_scale': 0.8,    # Scale factor for finger effects
+            # Effect per gesture ('fist', 'open_hand', 'single_<finger>'); 'default' covers
+            # gestures not listed, None disables the effect for a gesture
+            'gesture_effects': {
+                'open_hand': 'efek-api-unscreen',
+                'default': 'efek-api-unscreen',
+            },
+            'frame_clock_animation': False,  # Animate effects by frame_count instead of per hand
             # Trail configuration
             'trail_max_length': 30,      # Maximum number of trail points
             'trail_min_distance': 8,     # Minimum distance between trail points
             'trail_thickness': 8,        # Trail line thickness
             'trail_fade_steps': 15,      # Number of fade steps for trail
+            # Effect sprite cache
+            'sprite_cache_mb': 256,      # Memory budget for pre-scaled effect frames
+            'sprite_size_step': 4,       # Effect sizes are snapped to multiples of this
+            'sprite_warmup_sizes': [],   # Sizes to pre-scale at load time (empty = lazy)
+            'effect_frame_cache': True,  # Keep decoded GIF frames as .npy files in the user cache dir
+            'effect_cache_mb': 512,      # Disk budget for those files; larger effects decode in memory
+            # Region-of-interest inference
+            'roi_tracking': False,       # Run MediaPipe on a crop around tracked hands
+            'roi_padding': 0.35,         # Crop padding relative to hand extent
+            'roi_full_frame_interval': 30,  # Frames between forced full-frame passes
+            'roi_max_size': 256,         # Crops are downscaled to at most this size
+            # Hand identity tracking
+            'identity_max_distance': 0.2,  # Max palm movement (normalized) to keep an identity
+            'identity_grace_frames': 10,   # Frames a lost hand keeps its state before eviction
+            # Detection skipping
+            'detection_interval': 1,     # Run MediaPipe every N frames, extrapolate in between
+            'detection_max_speed': 20,   # Palm speed (px/frame) above which we always detect
+            # Adaptive quality
+            'target_fps': None,          # Enable the quality governor for this FPS (None = off)
+            # Headless mode
+            'headless': False,           # Track and publish events only; skip all drawing
+            'debug_overlay': True,       # Palm/fingertip markers and gesture text (off in production)
         }
         
-        # Cache frequently used values
-        self.palm_landmarks = [0, 5, 9, 13, 17]  # More stable landmarks
-        
-    def _load_effects(self, folder_path: str, flip_horizontal: bool = True) -> Dict:
-        """Load GIF effects with error handling and optimization"""
-        effects = {}
-        
-        if not os.path.exists(folder_path):
-            print(f"Warning: Effects directory not found: {folder_path}")
-            return effects
+        # Quality tier in use; the governor (if enabled) moves between tiers
+        self.quality = DEFAULT_TIERS[0]
+        self._pending_quality = None
+        self.governor = None
+        if self.config['target_fps']:
+            self.enable_quality_governor(self.config['target_fps'])
+        
+        # Pre-scaled effect frames, filled lazily or warmed up at load time
+        self.sprite_cache = EffectSpriteCache(
+            max_bytes=self.config['sprite_cache_mb'] * 1024 * 1024,
+            size_step=self.config['sprite_size_step'],
+            min_size=40,
+            max_size=self.config['max_effect_size'],
+            scale=scale_sprite  # Premultiplied sprites cropped to the opaque box
+        )
+        self.compositor = AlphaCompositor(max_size=self.config['max_effect_size'])
+        self.identity_tracker = HandIdentityTracker(
+            max_distance=self.config['identity_max_distance'],
+            grace_frames=self.config['identity_grace_frames']
+        )
+        self.extrapolator = LandmarkExtrapolator(
+            interval=self.config['detection_interval'],
+            max_speed=self.config['detection_max_speed']
+        )
+        self.profiler = FrameProfiler()  # Per-stage timing, off unless enabled
+        self.recorder: Optional[SessionRecorder] = None  # Landmark session recording, see session_log.py
+        self.event_bus: Optional[HandEventBus] = None     # Async gesture/position events, see events.py
+        self.sinks: List[FrameSink] = []  # Extra outputs for processed frames, see sinks.py
+        self.pipeline: Optional[FramePipeline] = None  # Set by run(pipelined=True), kept for its stats
+        self.frame_pool = FrameBufferPool(frame_size=(960, 720))  # Reused preprocessing buffers
+        self.trail_renderer = TrailRenderer(thickness=self.config['trail_thickness'])
+        self.overlay = OverlayLayer()  # Debug markers and text, rasterized once per distinct content
+        self.roi_tracker = HandRoiTracker(
+            padding=self.config['roi_padding'],
+            full_frame_interval=self.config['roi_full_frame_interval'],
+            max_size=self.config['roi_max_size'],
+            pool=self.frame_pool
+        )
         
-        for filename in os.listdir(folder_path):
-            if not filename.lower().endswith('.gif'):
-                continue
-                
-            name = os.path.splitext(filename)[0]
-            full_path = os.path.join(folder_path, filename)
-            
-            try:
-                gif_frames = imageio.mimread(full_path)
-                if flip_horizontal:
-                    frames = [cv2.flip(np.array(f), 1) for f in gif_frames]
-                else:
-                    frames = [np.array(f) for f in gif_frames]
-                
-                effects[name] = {
-                    "type": "gif", 
-                    "frames": frames,
-                    "frame_count": len(frames)
-                }
-                print(f"Loaded effect '{name}' with {len(frames)} frames")
-                
-            except Exception as e:
-                print(f"Error loading {filename}: {e}")
+        # Discover effects at initialization; mapped ones are packed into the atlas on first use
+        self.effects = self._load_effects(effects_folder)
+        self._atlas = None
         
+    def _create_hands(self, model_complexity: int):
+        """Create a MediaPipe Hands instance with the tracker's settings"""
+        import mediapipe as mp  # Only needed when the tracker runs its own detector
+        return mp.solutions.hands.Hands(
+            static_image_mode=False,
+            max_num_hands=2,
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.5,  # Lower tracking confidence for better performance
+            model_complexity=model_complexity
+        )
+    
+    def enable_quality_governor(self, target_fps: float, **kwargs) -> QualityGovernor:
+        """Adapt quality tiers to hold ``target_fps`` (extra kwargs go to QualityGovernor)"""
+        self.config['target_fps'] = target_fps
+        self.governor = QualityGovernor(target_fps, on_change=self._on_quality_change, **kwargs)
+        return self.governor
+    
+    def _on_quality_change(self, previous: QualityTier, tier: QualityTier, fps: float) -> None:
+        print(f"Quality tier: {previous.name} -> {tier.name} (running at {fps:.1f} fps, "
+              f"target {self.config['target_fps']})")
+        # Applied by the inference stage, which owns the MediaPipe instance
+        self._pending_quality = tier
+    
+    def _apply_quality(self, tier: QualityTier) -> None:
+        """Switch to a quality tier, rebuilding MediaPipe if the model changes"""
+        if tier.model_complexity != self.quality.model_complexity and self._owns_hands:
+            self.hands.close()
+            self.hands = self._create_hands(tier.model_complexity)
+            self.roi_tracker.reset()
+        self.quality = tier
+    
+    def _record_frame_time(self, seconds: float) -> None:
+        """Report one frame's processing time to the quality governor"""
+        if self.governor is not None:
+            self.governor.record(seconds)
+    
+    def _load_effects(self, folder_path: str, flip_horizontal: bool = True) -> EffectLibrary:
+        """Discover GIF effects; each one is decoded on first use (see effect_library.py)"""
+        effects = EffectLibrary(folder_path, flip_horizontal=flip_horizontal,
+                                use_cache=self.config['effect_frame_cache'],
+                                max_cache_bytes=self.config['effect_cache_mb'] * 1024 * 1024)
+        print(f"Found {len(effects)} effect(s): {', '.join(effects) or 'none'}")
         return effects
     
-    def _detect_gesture(self, landmarks) -> Tuple[str, Optional[Tuple[float, float]]]:
-        """Detect hand gesture and return gesture type with position"""
-        try:
-            # Define finger landmarks: [tip, pip, mcp] for each finger
-            fingers = {
-                'thumb': [4, 3, 2],
-                'index': [8, 6, 5],
-                'middle': [12, 10, 9],
-                'ring': [16, 14, 13],
-                'pinky': [20, 18, 17]
-            }
-            
-            extended_fingers = []
-            finger_positions = {}
-            
-            # Check each finger
-            for finger_name, (tip, pip, mcp) in fingers.items():
-                if finger_name == 'thumb':
-                    # Thumb: check horizontal distance (special case)
-                    is_extended = abs(landmarks[tip].x - landmarks[mcp].x) > 0.04
-                else:
-                    # Other fingers: tip should be above pip and mcp
-                    is_extended = (landmarks[tip].y < landmarks[pip].y and 
-                                 landmarks[tip].y < landmarks[mcp].y)
-                
-                if is_extended:
-                    extended_fingers.append(finger_name)
-                    finger_positions[finger_name] = (landmarks[tip].x, landmarks[tip].y)
+    @property
+    def atlas(self) -> SpriteAtlas:
+        """Sprite atlas holding every effect named in ``gesture_effects``, built on first use"""
+        if self._atlas is None:
+            names = [name for name in self.config['gesture_effects'].values() if name]
+            self._atlas = SpriteAtlas(self.effects, names)
+            print(f"Packed {len(self._atlas)} effect(s) into a "
+                  f"{self._atlas.nbytes / 2 ** 20:.1f} MB sprite atlas "
+                  f"({self._atlas.nbytes / max(1, self._atlas.source_bytes):.0%} of the full frames)")
             
-            # Determine gesture
-            if len(extended_fingers) == 0:
-                return "fist", None
-            elif len(extended_fingers) == 1:
-                finger_name = extended_fingers[0]
-                return f"single_{finger_name}", finger_positions[finger_name]
-            else:
-                return "open_hand", None
-                
-        except Exception as e:
-            print(f"Gesture detection error: {e}")
-            return "unknown", None
+            warm_up_sizes = self.config['sprite_warmup_sizes']
+            for name in dict.fromkeys(names):
+                if warm_up_sizes and name in self._atlas:
+                    added = self.sprite_cache.warm_up(name, self._atlas.frames(name), warm_up_sizes)
+                    print(f"Pre-scaled {added} sprites for effect '{name}'")
+        return self._atlas
+    
+    def _effect_for_gesture(self, gesture: str) -> Optional[str]:
+        """Effect name configured for a gesture, None if it has none (or it failed to load)"""
+        mapping = self.config['gesture_effects']
+        name = mapping.get(gesture, mapping.get('default'))
+        return name if name and name in self.atlas else None
+    
+    def share_effects(self, other: "HandEffectTracker") -> None:
+        """Use another tracker's effects, sprite atlas and sprite cache (one copy per process)"""
+        self.effects = other.effects
+        self.sprite_cache = other.sprite_cache
+        self._atlas = other.atlas
     
-    def _calculate_palm_center(self, landmarks) -> Tuple[float, float, float]:
+    def _detect_gesture(self, landmarks: np.ndarray) -> Tuple[str, Optional[Tuple[float, float]]]:
+        """Detect hand gesture and return gesture type with position"""
+        return classify_gestures(landmarks[np.newaxis])[0]
+    
+    def _calculate_palm_center(self, landmarks: np.ndarray) -> Tuple[float, float, float]:
         """Calculate stable palm center position"""
-        x_coords = [landmarks[i].x for i in self.palm_landmarks]
-        y_coords = [landmarks[i].y for i in self.palm_landmarks]
-        z_coords = [landmarks[i].z for i in self.palm_landmarks if landmarks[i].z is not None]
-        
-        cx = np.mean(x_coords)
-        cy = np.mean(y_coords)
-        cz = np.mean(z_coords) if z_coords else None
-        
-        return cx, cy, cz
+        cx, cy, cz = palm_centers(landmarks[np.newaxis])[0]
+        return float(cx), float(cy), float(cz)
     
-    def _calculate_hand_size(self, landmarks, frame_dims: Tuple[int, int]) -> float:
+    def _calculate_hand_size(self, landmarks: np.ndarray, frame_dims: Tuple[int, int]) -> float:
         """Calculate hand size based on key landmark distances"""
-        min_dim = min(frame_dims)
-        
-        # Method 1: Distance from wrist to middle finger tip
-        wrist = landmarks[0]
-        middle_tip = landmarks[12]
-        hand_length = math.sqrt(
-            (middle_tip.x - wrist.x)**2 + (middle_tip.y - wrist.y)**2
-        ) * min_dim
-        
-        # Method 2: Palm width (distance between pinky and index MCP)
-        index_mcp = landmarks[5]
-        pinky_mcp = landmarks[17]
-        palm_width = math.sqrt(
-            (pinky_mcp.x - index_mcp.x)**2 + (pinky_mcp.y - index_mcp.y)**2
-        ) * min_dim
-        
-        # Method 3: Thumb span (wrist to thumb tip)
-        thumb_tip = landmarks[4]
-        thumb_span = math.sqrt(
-            (thumb_tip.x - wrist.x)**2 + (thumb_tip.y - wrist.y)**2
-        ) * min_dim
-        
-        # Combine measurements for more stable size estimation
-        # Use weighted average: hand_length is most reliable
-        hand_size = (hand_length * 0.6 + palm_width * 1.8 + thumb_span * 0.4)
-        
-        return hand_size
+        return float(hand_sizes(landmarks[np.newaxis], min(frame_dims))[0])
     
-    def _overlay_effect_optimized(self, base_frame: np.ndarray, effect_frame: np.ndarray, 
-                                x: int, y: int, size: int) -> None:
-        """Optimized overlay with bounds checking and performance improvements"""
+    def _overlay_effect_optimized(self, base_frame: np.ndarray, effect_frame: Union[AtlasFrame, np.ndarray],
+                                x: int, y: int, size: int,
+                                effect_key: Optional[Tuple[str, int]] = None) -> None:
+        """Optimized overlay with bounds checking and performance improvements
+        
+        When ``effect_key`` (effect name, frame index) is given, the scaled
+        sprite comes from the sprite cache and ``size`` is snapped to its bucket.
+        Only the sprite's opaque box (see sprite_atlas.py) is blended.
+        """
         h, w = base_frame.shape[:2]
+        if effect_key is not None:
+            size = self.sprite_cache.bucket(size)
         
         # Early bounds checking
         half_size = size // 2
@@ -186,63 +246,37 @@ class HandEffectTracker:
         effect_x2 = effect_x1 + (x2 - x1)
         effect_y2 = effect_y1 + (y2 - y1)
         
-        # Resize effect frame only once
+        # Resize and premultiply effect frame only once (or look it up in the sprite cache)
         try:
-            effect_resized = cv2.resize(effect_frame, (size, size), 
-                                      interpolation=cv2.INTER_LINEAR)
+            if effect_key is not None:
+                sprite = self.sprite_cache.get(effect_key[0], effect_key[1],
+                                               effect_frame, size)
+            else:
+                sprite = scale_sprite(effect_frame, size)
             
-            # Extract the region we need
-            effect_region = effect_resized[effect_y1:effect_y2, effect_x1:effect_x2]
+            # Clip the visible part of the effect to the sprite's opaque box
+            off_x, off_y = sprite.offset
+            sprite_h, sprite_w = sprite.shape[:2]
+            sx1, sy1 = max(effect_x1, off_x), max(effect_y1, off_y)
+            sx2, sy2 = min(effect_x2, off_x + sprite_w), min(effect_y2, off_y + sprite_h)
+            if sx1 >= sx2 or sy1 >= sy2:
+                return
             
-            if effect_region.shape[2] == 4:  # RGBA
-                effect_rgb = effect_region[:, :, :3]
-                alpha = effect_region[:, :, 3:4] / 255.0
-                
-                # Vectorized blending
-                roi = base_frame[y1:y2, x1:x2]
-                blended = (alpha * effect_rgb + (1 - alpha) * roi).astype(np.uint8)
-                base_frame[y1:y2, x1:x2] = blended
-            else:  # RGB
-                base_frame[y1:y2, x1:x2] = effect_region
+            # Extract the region we need and blend it in place
+            color = sprite.color[sy1 - off_y:sy2 - off_y, sx1 - off_x:sx2 - off_x]
+            inv_alpha = (sprite.inv_alpha[sy1 - off_y:sy2 - off_y, sx1 - off_x:sx2 - off_x]
+                         if sprite.inv_alpha is not None else None)
+            bx, by = x1 + sx1 - effect_x1, y1 + sy1 - effect_y1
+            self.compositor.blend(base_frame[by:by + sy2 - sy1, bx:bx + sx2 - sx1], color, inv_alpha)
                 
         except Exception as e:
             print(f"Overlay error: {e}")
     
     def _draw_finger_trail(self, frame: np.ndarray, trail_points: List[Tuple[int, int]]) -> None:
         """Draw finger trail with shadow effect"""
-        if len(trail_points) < 2:
-            return
-        
-        # Create shadow effect by drawing multiple lines with decreasing opacity
-        shadow_offsets = [(2, 2), (1, 1), (0, 0)]  # Shadow offsets
-        shadow_colors = [(0, 0, 100), (0, 0, 150), (0, 0, 255)]  # Dark red to bright red
-        
-        for offset_idx, (dx, dy) in enumerate(shadow_offsets):
-            for i in range(1, len(trail_points)):
-                # Calculate fade factor based on position in trail
-                fade_factor = (i / len(trail_points)) * 0.8 + 0.2  # 0.2 to 1.0
-                
-                # Get points with shadow offset
-                pt1 = (trail_points[i-1][0] + dx, trail_points[i-1][1] + dy)
-                pt2 = (trail_points[i][0] + dx, trail_points[i][1] + dy)
-                
-                # Calculate thickness with fade
-                thickness = int(self.config['trail_thickness'] * fade_factor)
-                thickness = max(1, thickness)
-                
-                # Get color with fade
-                base_color = shadow_colors[offset_idx]
-                color = tuple(int(c * fade_factor) for c in base_color)
-                
-                # Draw line segment
-                cv2.line(frame, pt1, pt2, color, thickness)
-                
-                # Add glow effect for the main trail (no offset)
-                if offset_idx == 2:  # Main trail
-                    # Draw a thinner, brighter line on top
-                    glow_thickness = max(1, thickness // 2)
-                    glow_color = (50, 50, 255)  # Brighter red
-                    cv2.line(frame, pt1, pt2, glow_color, glow_thickness)
+        # Lower quality tiers skip the outer shadow passes; the main trail is always drawn
+        self.trail_renderer.thickness = self.config['trail_thickness']
+        self.trail_renderer.draw(frame, trail_points, self.quality.trail_shadow_passes)
     
     def _update_finger_trail(self, state: Dict, current_pos: Tuple[int, int], current_finger: str) -> None:
         """Update finger trail points"""
@@ -263,9 +297,16 @@ class HandEffectTracker:
                      (current_pos[1] - state['trail_points'][-1][1])**2) >= self.config['trail_min_distance']):
             state['trail_points'].append(current_pos)
     
-    def _update_hand_state(self, hand_idx: int, landmarks, frame_dims: Tuple[int, int]) -> None:
-        """Update hand state with improved smoothing and stability"""
+    def _update_hand_state(self, hand_idx: int, landmarks: np.ndarray, frame_dims: Tuple[int, int],
+                           measurements: Optional[HandMeasurements] = None) -> None:
+        """Update hand state with improved smoothing and stability
+        
+        ``landmarks`` is a (21, 3) array; ``measurements`` may carry values
+        already computed for the whole frame by ``measure_hands``.
+        """
         min_dim = min(frame_dims)
+        if measurements is None:
+            measurements = measure_hands(landmarks[np.newaxis], min_dim)[0]
         
         # Initialize hand state if needed
         if hand_idx not in self.hand_states:
@@ -283,7 +324,7 @@ class HandEffectTracker:
         state = self.hand_states[hand_idx]
         
         # Detect current gesture
-        gesture, finger_pos = self._detect_gesture(landmarks)
+        gesture, finger_pos = measurements.gesture, measurements.finger_position
         previous_gesture = state['current_gesture']
         state['current_gesture'] = gesture
         
@@ -316,7 +357,7 @@ class HandEffectTracker:
                 self._update_finger_trail(state, (cx_px, cy_px), gesture)
                 
                 # Use smaller effect size for single finger
-                current_hand_size = self._calculate_hand_size(landmarks, frame_dims)
+                current_hand_size = measurements.hand_size
                 size_ratio = current_hand_size / self.config['reference_hand_size']
                 target_effect_size = int(self.config['finger_effect_size'] * size_ratio * self.config['finger_size_scale'])
                 target_effect_size = max(40, min(150, target_effect_size))
@@ -324,7 +365,7 @@ class HandEffectTracker:
                 return
         else:
             # Open hand gesture - use palm center
-            cx, cy, cz = self._calculate_palm_center(landmarks)
+            cx, cy, cz = measurements.palm_center
             cx_px, cy_px = int(cx * min_dim), int(cy * min_dim)
             state['finger_position'] = None
             
@@ -334,7 +375,7 @@ class HandEffectTracker:
                 state['last_trail_finger'] = None
             
             # Use normal effect size for open hand
-            current_hand_size = self._calculate_hand_size(landmarks, frame_dims)
+            current_hand_size = measurements.hand_size
             size_ratio = current_hand_size / self.config['reference_hand_size']
             target_effect_size = int(self.config['base_effect_size'] * size_ratio * self.config['hand_size_scale'])
             target_effect_size = max(self.config['min_effect_size'],
@@ -367,48 +408,129 @@ class HandEffectTracker:
             state['position_history'].append((state['smooth_x'], state['smooth_y']))
     
     def process_frame(self, frame: np.ndarray) -> np.ndarray:
-        """Process a single frame with hand tracking and effects"""
+        """Process a single frame with hand tracking and effects
+        
+        The returned square is one of ``self.frame_pool``'s reused buffers: it
+        stays valid for ``slots - 1`` more calls (one by default) and is then
+        overwritten. Copy it to keep it longer, or raise the rotation with
+        ``frame_pool.ensure_slots(n)`` when up to ``n - 1`` outputs are queued.
+        """
+        start = time.perf_counter()
+        detect = self.extrapolator.should_detect(self.hand_states)
+        frame_square, rgb, frame_dims = self._prepare_frame(frame, need_rgb=detect)
+        
+        if detect:
+            results = self._detect_hands(rgb)
+        else:
+            # Skip inference: move the last landmarks along their estimated velocity
+            results = self.extrapolator.predict()
+        output = self._render_results(frame_square, results, frame_dims, predicted=not detect)
+        
+        if detect:
+            self._observe_detection(results)
+        self._record_frame_time(time.perf_counter() - start)
+        self.profiler.end_frame(len(self.hand_points), start)
+        return output
+    
+    def _observe_detection(self, results, frame: Optional[int] = None) -> None:
+        """Feed a rendered real detection (of capture index ``frame``, if known) to the extrapolator"""
+        self.extrapolator.observe(self.hand_points, self.hand_ids,
+                                  handedness_labels(results.multi_handedness, len(self.hand_points)),
+                                  frame=frame)
+    
+    def _prepare_frame(self, frame: np.ndarray,
+                       need_rgb: bool = True) -> Tuple[np.ndarray, Optional[np.ndarray], Tuple[int, int]]:
+        """Flip, resize and crop a camera frame; returns (BGR square, RGB square, frame dims)
+        
+        The RGB square is only needed for inference and is None when ``need_rgb`` is False.
+        """
+        t0 = self.profiler.clock()
+        # Same square as flip + resize to 960x720 + center crop, written into a reused buffer
+        frame_square = self.frame_pool.square(frame)
+        self.profiler.record('flip_resize', t0)
+        
+        rgb = None
+        if need_rgb:
+            t0 = self.profiler.clock()
+            rgb = self.frame_pool.to_rgb(frame_square)
+            self.profiler.record('color_convert', t0)
+        return frame_square, rgb, self.frame_pool.frame_dims
+    
+    def _detect_hands(self, rgb: np.ndarray):
+        """Run MediaPipe hand detection on a prepared RGB square"""
+        t0 = self.profiler.clock()
+        if self._pending_quality is not None:
+            self._apply_quality(self._pending_quality)
+            self._pending_quality = None
+        
+        # Lower quality tiers run inference on a downscaled square
+        if rgb.shape[0] > self.quality.inference_size:
+            rgb = self.frame_pool.downscale(rgb, self.quality.inference_size)
+        
+        if self.config['roi_tracking']:
+            results = self.roi_tracker.process(self.hands, rgb)
+        else:
+            results = self.hands.process(rgb)
+        self.profiler.record('inference', t0)
+        return results
+    
+    def _render_results(self, frame_square: np.ndarray, results, 
+                        frame_dims: Tuple[int, int], predicted: bool = False) -> np.ndarray:
+        """Update hand states from detection results and draw trails and effects
+        
+        ``predicted`` marks results extrapolated on a frame where inference
+        was skipped; the session recorder stores those frames as flags only.
+        """
         self.frame_count += 1
+        t0 = self.profiler.clock()
         
-        # Prepare frame
-        frame = cv2.flip(frame, 1)
-        frame = cv2.resize(frame, (960, 720))
-        h, w = frame.shape[:2]
-        min_dim = min(h, w)
-        
-        # Crop to square
-        x_start, y_start = (w - min_dim) // 2, (h - min_dim) // 2
-        frame_square = frame[y_start:y_start + min_dim, x_start:x_start + min_dim]
-        
-        # Process hands
-        rgb = cv2.cvtColor(frame_square, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(rgb)
-        
-        if results.multi_hand_landmarks:
-            # Clean up states for undetected hands
-            detected_indices = set(range(len(results.multi_hand_landmarks)))
-            for idx in list(self.hand_states.keys()):
-                if idx not in detected_indices:
-                    del self.hand_states[idx]
-            
-            # Process each detected hand
-            for hand_idx, hand_landmarks in enumerate(results.multi_hand_landmarks):
-                self._update_hand_state(hand_idx, hand_landmarks.landmark, (h, w))
-                
-                # Get hand state
-                state = self.hand_states[hand_idx]
+        # Latest landmarks as an (n, 21, 3) array, kept for logging and inspection
+        self.hand_points = landmarks_to_array(results.multi_hand_landmarks)
+        
+        labels = handedness_labels(results.multi_handedness, len(self.hand_points))
+        if self.recorder is not None:
+            self.recorder.write(self.hand_points, labels, predicted=predicted)
+        
+        # Match detections to stable hand identities; states are keyed by identity
+        hand_measurements = measure_hands(self.hand_points, min(frame_dims))
+        hand_ids = self.identity_tracker.assign(
+            np.array([m.palm_center for m in hand_measurements]).reshape(-1, 3),
+            labels
+        )
+        self.hand_ids = hand_ids
+        for hand_id in self.identity_tracker.evicted:
+            self.hand_states.pop(hand_id, None)
+        self.profiler.record('state_update', t0)
+        
+        # Update every hand first so events go out before any drawing
+        t0 = self.profiler.clock()
+        for hand_idx, hand_landmarks in enumerate(self.hand_points):
+            self._update_hand_state(hand_ids[hand_idx], hand_landmarks, frame_dims,
+                                    hand_measurements[hand_idx])
+        if self.event_bus is not None:
+            self.event_bus.publish_frame(self.frame_count, self.hand_states, hand_ids,
+                                         self.identity_tracker.evicted, min(frame_dims))
+        self.profiler.record('state_update', t0)
+        
+        if len(self.hand_points) and not self.config['headless']:
+            # Render each detected hand
+            for hand_idx, hand_id in enumerate(hand_ids):
+                state = self.hand_states[hand_id]
                 
                 # Draw finger trail first (behind the effect)
                 if (state['current_gesture'].startswith('single_') and 
                     len(state['trail_points']) > 1):
+                    t0 = self.profiler.clock()
                     self._draw_finger_trail(frame_square, list(state['trail_points']))
+                    self.profiler.record('trail', t0)
                 
                 # Render effect if hand is stable
+                effect_name = self._effect_for_gesture(state['current_gesture'])
                 if (state['is_stable'] and state['smooth_x'] is not None and 
-                    state['smooth_size'] is not None and "efek-api-unscreen" in self.effects):
+                    state['smooth_size'] is not None and effect_name is not None):
                     
                     # Use the calculated hand size for effect size
-                    effect_size = state['smooth_size']
+                    effect_size = int(state['smooth_size'] * self.quality.effect_scale)
                     
                     # Determine effect position based on gesture
                     if state['current_gesture'].startswith("single_") and state['finger_position']:
@@ -421,81 +543,219 @@ class HandEffectTracker:
                         effect_y = state['smooth_y'] + self.config['effect_y_offset']
                     
                     # Render effect
-                    effect_frames = self.effects["efek-api-unscreen"]["frames"]
+                    t0 = self.profiler.clock()
+                    effect_frames = self.atlas.frames(effect_name)
+                    if self.config['frame_clock_animation']:
+                        # Same frame at the same frame_count, however long the hand was tracked
+                        frame_index = self.frame_count % len(effect_frames)
+                    else:
+                        frame_index = state['frame_index'] % len(effect_frames)  # Effects differ in length
                     
                     self._overlay_effect_optimized(
                         frame_square,
-                        effect_frames[state['frame_index']],
+                        effect_frames[frame_index],
                         effect_x,
                         effect_y,
-                        effect_size
+                        effect_size,
+                        effect_key=(effect_name, frame_index)
                     )
                     
                     # Update animation frame
-                    state['frame_index'] = (state['frame_index'] + 1) % len(effect_frames)
+                    state['frame_index'] = (frame_index + 1) % len(effect_frames)
+                    self.profiler.record('overlay', t0)
                     
-                    # Debug visualization
+                    # Debug visualization (composited after all hands, see overlay.py)
+                    if not self.config['debug_overlay']:
+                        continue
+                    t0 = self.profiler.clock()
                     if state['current_gesture'].startswith("single_") and state['finger_position']:
                         # Show fingertip position
-                        cv2.circle(frame_square, state['finger_position'], 
-                                 5, (255, 0, 255), -1)  # Magenta for fingertip
+                        self.overlay.circle(('marker', hand_idx), state['finger_position'],
+                                            5, (255, 0, 255))  # Magenta for fingertip
                     else:
                         # Show palm center
-                        cv2.circle(frame_square, (state['smooth_x'], state['smooth_y']), 
-                                 8, (0, 255, 255), -1)  # Cyan for palm
+                        self.overlay.circle(('marker', hand_idx), (state['smooth_x'], state['smooth_y']),
+                                            8, (0, 255, 255))  # Cyan for palm
                     
                     # Debug text showing gesture and size
                     gesture_name = state['current_gesture'].replace('single_', '').title() if state['current_gesture'].startswith('single_') else 'Open Hand'
                     trail_info = f" | Trail: {len(state['trail_points'])}" if state['current_gesture'].startswith('single_') else ""
                     debug_text = f"Hand {hand_idx + 1}: {gesture_name} | Size={effect_size}{trail_info}"
-                    cv2.putText(frame_square, debug_text, (10, 40 + 30 * hand_idx),
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
-        
+                    self.overlay.put_text(('text', hand_idx), debug_text, (10, 40 + 30 * hand_idx),
+                                          cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+                    self.profiler.record('debug_text', t0)
+        
+        t0 = self.profiler.clock()
+        self.overlay.composite(frame_square)
+        self.overlay.begin()
+        self.profiler.record('debug_text', t0)
         return frame_square
     
-    def run(self):
-        """Main execution loop"""
-        cap = cv2.VideoCapture(0)
+    def run(self, source=0, pipelined: bool = False, show_window: bool = True):
+        """Main execution loop
+        
+        ``source`` is a camera index or a video file path. With ``pipelined``
+        capture and inference run on worker threads (see pipeline.py).
+        Processed frames go to every sink in ``self.sinks`` and, unless
+        ``show_window`` is False, to a preview window.
+        """
+        cap = cv2.VideoCapture(source)
+        is_camera = isinstance(source, int)
         
         # Optimize camera settings
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        cap.set(cv2.CAP_PROP_FPS, 30)
+        if is_camera:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+            cap.set(cv2.CAP_PROP_FPS, 30)
         
         try:
+            if pipelined:
+                # Pace video files at their native rate so they behave like a camera
+                pace_fps = None if is_camera else (cap.get(cv2.CAP_PROP_FPS) or 30.0)
+                self._run_pipelined(cap, pace_fps, show_window)
+                return
+            
             while True:
                 ret, frame = cap.read()
                 if not ret:
                     break
                 
                 processed_frame = self.process_frame(frame)
-                cv2.imshow("Hand Effects with Finger Trail", processed_frame)
-                
-                key = cv2.waitKey(1) & 0xFF
-                if key == 27 or key == ord('q'):  # ESC or 'q' to quit
+                if self._output_frame(processed_frame, show_window):
                     break
                     
         finally:
             cap.release()
             cv2.destroyAllWindows()
+            self._report_profile()
+            if self.recorder is not None:
+                self.recorder.close()
+            for sink in self.sinks:
+                sink.close()
+                print(sink.describe())
+    
+    def _output_frame(self, frame: np.ndarray, show_window: bool) -> bool:
+        """Send a processed frame to the sinks and the window; returns True when the user asked to quit"""
+        self.profiler.draw_hud(frame)
+        for sink in self.sinks:
+            sink.write(frame)
+        if not show_window:
+            return False
+        cv2.imshow("Hand Effects with Finger Trail", frame)
+        return self._handle_key(cv2.waitKey(1) & 0xFF)
+    
+    def _handle_key(self, key: int) -> bool:
+        """React to a key press; returns True when the user asked to quit"""
+        if key == ord('h'):  # Toggle the FPS/latency HUD
+            self.profiler.toggle_hud()
+        return key == 27 or key == ord('q')  # ESC or 'q' to quit
+    
+    def _report_profile(self) -> None:
+        """Print the per-stage latency summary and close any telemetry export"""
+        if self.profiler.frames:
+            summary = self.profiler.summary()
+            print(f"Profiled {summary['frames']} frames, dropped {summary['dropped']}, "
+                  f"hands per frame {summary['hand_counts']}")
+            for stage, stats in summary['stages'].items():
+                print(f"{stage:>14}: mean {stats['mean_ms']:.2f} ms, p50 {stats['p50_ms']:.2f}, "
+                      f"p95 {stats['p95_ms']:.2f}, p99 {stats['p99_ms']:.2f}, max {stats['max_ms']:.2f}")
+        self.profiler.close()
+    
+    def _run_pipelined(self, cap: cv2.VideoCapture, pace_fps: Optional[float],
+                       show_window: bool = True) -> None:
+        """Display loop for the threaded capture/inference/render pipeline"""
+        pipeline = self.pipeline = FramePipeline(self, cap, pace_fps=pace_fps)
+        pipeline.start()
+        
+        try:
+            while not pipeline.finished:
+                processed_frame = pipeline.next_frame(timeout=0.5)
+                if processed_frame is None:
+                    continue
+                
+                if self._output_frame(processed_frame, show_window):
+                    break
+        finally:
+            pipeline.stop()
+            for name, stage in pipeline.stats().items():
+                print(f"{name:>10}: avg {stage['avg_ms']:.1f} ms, "
+                      f"max {stage['max_ms']:.1f} ms, {stage['fps']:.1f} fps, "
+                      f"dropped {stage.get('dropped', 0)}")
 
 def main():
     """Main function to run the hand effect tracker"""
+    parser = argparse.ArgumentParser(description="Hand effects with finger trail")
+    parser.add_argument("--source", default="0",
+                        help="Camera index or video file path (default: 0)")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="Run capture and inference on separate threads")
+    parser.add_argument("--roi", action="store_true",
+                        help="Run hand detection on a crop around tracked hands")
+    parser.add_argument("--target-fps", type=float, default=None,
+                        help="Adapt quality tiers to hold this frame rate")
+    parser.add_argument("--detect-every", type=int, default=1, metavar="N",
+                        help="Run hand detection every N frames and extrapolate in between")
+    parser.add_argument("--profile", metavar="PATH", default=None,
+                        help="Record per-stage timings to PATH (.csv or .jsonl)")
+    parser.add_argument("--hud", action="store_true",
+                        help="Show the FPS/latency HUD (toggle with 'h')")
+    parser.add_argument("--no-debug", action="store_true",
+                        help="Hide the palm/fingertip markers and gesture text")
+    parser.add_argument("--record", metavar="PATH", default=None,
+                        help="Record detected landmarks to PATH for replay (see session_log.py)")
+    parser.add_argument("--shm", metavar="NAME", default=None,
+                        help="Publish processed frames to shared memory NAME (read with sinks.py)")
+    parser.add_argument("--output", metavar="PATH", default=None,
+                        help="Encode processed frames to PATH on a background thread")
+    parser.add_argument("--no-window", action="store_true",
+                        help="Do not open the preview window (stop with Ctrl+C)")
+    args = parser.parse_args()
+    source = int(args.source) if args.source.isdigit() else args.source
+    
     tracker = HandEffectTracker()
+    tracker.config['roi_tracking'] = args.roi
+    tracker.extrapolator.interval = args.detect_every
+    if args.target_fps:
+        tracker.enable_quality_governor(args.target_fps)
+    if args.profile:
+        tracker.profiler.enabled = True
+        tracker.profiler.open_export(args.profile)
+    if args.hud:
+        tracker.profiler.toggle_hud()
+    tracker.config['debug_overlay'] = not args.no_debug
     
     if not tracker.effects:
         print("No effects loaded. Please ensure 'effects' folder exists with GIF files.")
         return
+    if args.shm:
+        try:
+            tracker.sinks.append(SharedMemorySink(args.shm))
+        except FileExistsError as e:
+            print(f"Error: {e}")
+            return
+    if args.output:
+        fps = 30.0
+        if not isinstance(source, int):
+            probe = cv2.VideoCapture(source)
+            fps = probe.get(cv2.CAP_PROP_FPS) or 30.0
+            probe.release()
+        # Video files have no live deadline, so wait for the encoder instead of dropping frames
+        tracker.sinks.append(EncoderSink(args.output, fps=fps, block=not isinstance(source, int)))
+    if args.record:
+        tracker.recorder = SessionRecorder(args.record, metadata={'source': args.source})
     
     print("Starting hand effect tracker with finger trail...")
-    print("Press ESC or 'q' to quit")
+    print("Press ESC or 'q' to quit, 'h' to toggle the FPS/latency HUD")
     print("Gestures:")
     print("- Make a fist to reset hand tracking and trail")
     print("- Show single finger for fingertip fire effect with red trail")
     print("- Open hand for palm fire effect (trail will be cleared)")
     print("- Switch between different single fingers to reset trail")
     
-    tracker.run()
+    try:
+        tracker.run(source=source, pipelined=args.pipelined, show_window=not args.no_window)
+    except KeyboardInterrupt:
+        pass
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,105 @@
+import math
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+from landmarks import HandDetections
+
+
+class LandmarkExtrapolator:
+    """Decides when to skip MediaPipe and predicts landmarks for skipped frames
+
+    Each hand identity keeps its last detected (21, 3) landmarks and a
+    constant-velocity estimate from the two most recent detections. Between
+    detections the whole landmark set (and so palm center and fingertip) is
+    moved along that velocity. Inference is forced every ``interval``
+    frames, when nothing is tracked, and whenever the smoothed palm motion
+    in a hand's ``position_history`` is faster than ``max_speed`` px/frame,
+    where a linear prediction would be unreliable.
+    """
+
+    def __init__(self, interval: int = 2, max_speed: float = 20.0):
+        self.interval = interval
+        self.max_speed = max_speed
+
+        self._last: Dict[int, np.ndarray] = {}
+        self._velocity: Dict[int, np.ndarray] = {}
+        self._labels: Dict[int, Optional[str]] = {}
+        self._last_frame: Optional[int] = None  # Capture index of the last detection, if known
+        self.frames_since_detection = 0
+        self.detections = 0
+        self.predictions = 0
+
+    def reset(self) -> None:
+        self._last.clear()
+        self._velocity.clear()
+        self._labels.clear()
+        self._last_frame = None
+        self.frames_since_detection = 0
+
+    def should_detect(self, hand_states: Dict) -> bool:
+        if self.interval <= 1 or not self._last:
+            return True
+        if self.frames_since_detection + 1 >= self.interval:
+            return True
+        for hand_id in list(self._last):  # May be called from the pipeline's inference thread
+            state = hand_states.get(hand_id)
+            if state is None or self._speed(state['position_history']) > self.max_speed:
+                return True
+        return False
+
+    def observe(self, points: np.ndarray, hand_ids: Sequence[int],
+                labels: Sequence[Optional[str]], frame: Optional[int] = None) -> None:
+        """Record a real detection (landmarks in the same order as ``hand_ids``)
+
+        ``frame`` is the capture index of the detected frame. Give it when
+        not every captured frame reaches the extrapolator (pipelined mode
+        drops frames), so velocities are per captured frame; otherwise
+        calls are counted.
+        """
+        gap = self._frames_since(frame) if frame is not None else self.frames_since_detection + 1
+        last, velocity, hand_labels = {}, {}, {}
+        for hand_points, hand_id, label in zip(points, hand_ids, labels):
+            previous = self._last.get(hand_id)
+            if previous is not None:
+                velocity[hand_id] = (hand_points - previous) / gap
+            else:
+                velocity[hand_id] = np.zeros_like(hand_points)
+            last[hand_id] = hand_points
+            hand_labels[hand_id] = label
+
+        self._last, self._velocity, self._labels = last, velocity, hand_labels
+        self._last_frame = frame
+        self.frames_since_detection = 0
+        self.detections += 1
+
+    def predict(self, frame: Optional[int] = None) -> HandDetections:
+        """Extrapolated landmarks for a frame on which inference is skipped
+
+        With the capture index ``frame`` (see ``observe``) the landmarks are
+        moved over the frames actually captured since the last detection.
+        """
+        if frame is not None:
+            self.frames_since_detection = self._frames_since(frame)
+        else:
+            self.frames_since_detection += 1
+        self.predictions += 1
+        if not self._last:
+            return HandDetections(None, None)
+
+        ids = list(self._last)
+        points = np.stack([self._last[i] + self._velocity[i] * self.frames_since_detection
+                           for i in ids]).astype(np.float32)
+        return HandDetections(points, [self._labels.get(i) for i in ids])
+
+    def _frames_since(self, frame: int) -> int:
+        if self._last_frame is None:
+            return self.frames_since_detection + 1
+        return max(1, frame - self._last_frame)
+
+    @staticmethod
+    def _speed(history: Sequence) -> float:
+        """Average smoothed palm speed in px/frame over the position history"""
+        if len(history) < 2:
+            return 0.0
+        (x0, y0), (x1, y1) = history[0], history[-1]
+        return math.hypot(x1 - x0, y1 - y0) / (len(history) - 1)
@@ -0,0 +1,163 @@
+import cv2
+import numpy as np
+import collections
+from typing import Dict, Hashable, Optional, Tuple
+
+from compositing import AlphaCompositor, PremultipliedSprite, premultiply
+
+Color = Tuple[int, int, int]
+
+
+class OverlaySprite:
+    """Rasterized overlay element: a coverage mask plus where it sits relative to its anchor"""
+
+    __slots__ = ('mask', 'color', 'offset', 'blended')
+
+    def __init__(self, mask: np.ndarray, color: Color, offset: Tuple[int, int], binary: bool):
+        self.mask = mask              # uint8 (h, w): 255 where covered
+        self.color = color
+        self.offset = offset          # (dx, dy) of the mask's top-left corner from the anchor
+        self.blended: Optional[PremultipliedSprite] = None
+        if not binary:
+            # Anti-aliased coverage is blended like an effect sprite
+            rgba = np.empty(mask.shape + (4,), dtype=np.uint8)
+            rgba[..., :3] = color
+            rgba[..., 3] = mask
+            self.blended = premultiply(rgba)
+
+    @property
+    def nbytes(self) -> int:
+        return self.mask.nbytes + (self.blended.nbytes if self.blended is not None else 0)
+
+
+class OverlayCache:
+    """LRU cache of rasterized text and shapes, keyed by everything that affects their pixels"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._sprites: "collections.OrderedDict[Hashable, OverlaySprite]" = collections.OrderedDict()
+        self.hits = 0
+        self.rasterized = 0
+
+    def text(self, text: str, font: int, scale: float, color: Color, thickness: int = 1,
+             line_type: int = cv2.LINE_8) -> OverlaySprite:
+        key = ('text', text, font, scale, color, thickness, line_type)
+        sprite = self._lookup(key)
+        if sprite is None:
+            (width, height), baseline = cv2.getTextSize(text, font, scale, thickness)
+            # Italic/script glyphs and thick strokes reach past getTextSize's box, so
+            # rasterize with a wide margin and keep the real extent of the glyphs
+            margin = height + baseline + 2 * thickness
+            canvas = np.zeros((height + baseline + 2 * margin, width + 2 * margin), dtype=np.uint8)
+            cv2.putText(canvas, text, (margin, height + margin), font, scale, 255, thickness, line_type)
+            x, y, w, h = cv2.boundingRect(canvas)
+            sprite = self._store(key, OverlaySprite(canvas[y:y + h, x:x + w].copy(), color,
+                                                    (x - margin, y - (height + margin)),
+                                                    line_type != cv2.LINE_AA))
+        return sprite
+
+    def circle(self, radius: int, color: Color) -> OverlaySprite:
+        """Filled circle, as drawn by ``cv2.circle(..., -1)``"""
+        key = ('circle', radius, color)
+        sprite = self._lookup(key)
+        if sprite is None:
+            pad = radius + 1
+            mask = np.zeros((2 * pad + 1, 2 * pad + 1), dtype=np.uint8)
+            cv2.circle(mask, (pad, pad), radius, 255, -1)
+            sprite = self._store(key, OverlaySprite(mask, color, (-pad, -pad), True))
+        return sprite
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'rasterized': self.rasterized, 'entries': len(self._sprites)}
+
+    def _lookup(self, key: Hashable) -> Optional[OverlaySprite]:
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+        return sprite
+
+    def _store(self, key: Hashable, sprite: OverlaySprite) -> OverlaySprite:
+        self.rasterized += 1
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.max_entries:
+            self._sprites.popitem(last=False)
+        return sprite
+
+
+class OverlayLayer:
+    """Debug/HUD overlay elements composited onto each frame
+
+    Elements are declared every frame between ``begin`` and ``composite``
+    under a stable slot key. Unchanged text or shapes come from the cache,
+    so only elements whose content changed are rasterized again, and
+    compositing touches each element's bounding box only. A disabled
+    layer ignores everything.
+
+    Output matches drawing with OpenCV directly: exactly for shapes and
+    LINE_8 text, within a few levels for LINE_AA text (OpenCV blends
+    overlapping anti-aliased strokes one after another). Elements that
+    cross the frame edge are drawn directly, because OpenCV clips strokes
+    to the image and that changes their rasterization.
+    """
+
+    def __init__(self, cache: Optional[OverlayCache] = None, enabled: bool = True):
+        self.cache = cache or OverlayCache()
+        self.enabled = enabled
+        self._items: Dict[Hashable, Tuple[OverlaySprite, int, int, Tuple]] = {}
+        self._fill: Dict[Tuple[Tuple[int, int], Color], np.ndarray] = {}
+        self._compositor = AlphaCompositor(max_size=64)
+
+    def begin(self) -> None:
+        self._items.clear()
+
+    def put_text(self, slot: Hashable, text: str, org: Tuple[int, int], font: int, scale: float,
+                 color: Color, thickness: int = 1, line_type: int = cv2.LINE_8) -> None:
+        """Equivalent of ``cv2.putText`` with the same arguments"""
+        if self.enabled:
+            self._items[slot] = (self.cache.text(text, font, scale, color, thickness, line_type),
+                                 org[0], org[1], ('text', text, org, font, scale, color, thickness, line_type))
+
+    def circle(self, slot: Hashable, center: Tuple[int, int], radius: int, color: Color) -> None:
+        """Equivalent of a filled ``cv2.circle``"""
+        if self.enabled:
+            self._items[slot] = (self.cache.circle(radius, color), center[0], center[1],
+                                 ('circle', center, radius, color))
+
+    def composite(self, frame: np.ndarray) -> None:
+        """Draw every element declared since ``begin`` onto ``frame``, in declaration order"""
+        frame_h, frame_w = frame.shape[:2]
+        for sprite, anchor_x, anchor_y, draw in self._items.values():
+            mask_h, mask_w = sprite.mask.shape
+            x, y = anchor_x + sprite.offset[0], anchor_y + sprite.offset[1]
+            if not sprite.mask.size or x >= frame_w or y >= frame_h or x + mask_w <= 0 or y + mask_h <= 0:
+                continue
+            if x < 0 or y < 0 or x + mask_w > frame_w or y + mask_h > frame_h:
+                self._draw_direct(frame, draw)
+                continue
+            roi = frame[y:y + mask_h, x:x + mask_w]
+            if sprite.blended is not None:
+                self._compositor.blend(roi, sprite.blended.color, sprite.blended.inv_alpha)
+            else:
+                cv2.copyTo(self._fill_for(sprite.mask.shape, sprite.color), sprite.mask, dst=roi)
+
+    @staticmethod
+    def _draw_direct(frame: np.ndarray, draw: Tuple) -> None:
+        """Draw an element with OpenCV, as declared (for elements crossing the frame edge)"""
+        if draw[0] == 'text':
+            _, text, org, font, scale, color, thickness, line_type = draw
+            cv2.putText(frame, text, org, font, scale, color, thickness, line_type)
+        else:
+            _, center, radius, color = draw
+            cv2.circle(frame, center, radius, color, -1)
+
+    def _fill_for(self, shape: Tuple[int, int], color: Color) -> np.ndarray:
+        """Solid color patch of ``shape``, reused across frames"""
+        fill = self._fill.get((shape, color))
+        if fill is None:
+            fill = np.empty(shape + (3,), dtype=np.uint8)
+            fill[...] = color
+            if len(self._fill) > 64:
+                self._fill.clear()
+            self._fill[(shape, color)] = fill
+        return fill
@@ -0,0 +1,244 @@
+import cv2
+import numpy as np
+import threading
+import time
+import collections
+from typing import Any, Callable, Dict, Optional
+
+
+class DropOldestQueue:
+    """Bounded queue that discards the oldest item instead of blocking the producer
+
+    Items for which ``keep(item)`` is true (e.g. frames carrying a real
+    detection) are only discarded in favour of a newer kept item: a full
+    queue drops its oldest other item first, and ``get(latest=True)``
+    never skips past one.
+    """
+
+    def __init__(self, maxsize: int = 2, keep: Optional[Callable[[Any], bool]] = None):
+        self._items = collections.deque(maxlen=max(1, maxsize))
+        self.keep = keep
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item: Any, block: bool = False) -> Optional[Any]:
+        """Append an item; returns the oldest one if it was dropped to make room
+        
+        With ``block`` a full queue makes the producer wait for room instead
+        (for sources without a live deadline, e.g. video files).
+        """
+        with self._cond:
+            while block and len(self._items) == self._items.maxlen and not self._closed:
+                self._cond.wait()
+            dropped = None
+            if len(self._items) == self._items.maxlen:
+                index = 0
+                if self.keep is not None:
+                    index = next((i for i, queued in enumerate(self._items) if not self.keep(queued)), 0)
+                dropped = self._items[index]
+                del self._items[index]
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify_all()
+            return dropped
+
+    def get(self, timeout: Optional[float] = None, latest: bool = False) -> Optional[Any]:
+        """Pop the oldest item (or the newest one, discarding older ones); None on timeout/close
+
+        With ``latest`` and a ``keep`` predicate, the newest kept item is
+        returned instead when a newer item is not kept; the items after it
+        stay queued.
+        """
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            if latest:
+                index = len(self._items) - 1
+                if self.keep is not None and not self.keep(self._items[index]):
+                    index = next((i for i in reversed(range(index)) if self.keep(self._items[i])), index)
+                for _ in range(index):
+                    self._items.popleft()
+                self.dropped += index
+                item = self._items.popleft()
+            else:
+                item = self._items.popleft()
+            self._cond.notify_all()  # Wake a producer blocked on a full queue
+            return item
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class StageStats:
+    """Rolling timing statistics for one pipeline stage"""
+
+    def __init__(self, name: str, window: int = 120):
+        self.name = name
+        self.count = 0
+        self._samples = collections.deque(maxlen=window)
+        self._stamps = collections.deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.count += 1
+            self._samples.append(seconds)
+            self._stamps.append(time.perf_counter())
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            samples = list(self._samples)
+            stamps = list(self._stamps)
+        if not samples:
+            return {'count': self.count, 'last_ms': 0.0, 'avg_ms': 0.0, 'max_ms': 0.0, 'fps': 0.0}
+        span = stamps[-1] - stamps[0]
+        return {
+            'count': self.count,
+            'last_ms': samples[-1] * 1000,
+            'avg_ms': sum(samples) / len(samples) * 1000,
+            'max_ms': max(samples) * 1000,
+            'fps': (len(stamps) - 1) / span if span > 0 else 0.0,
+        }
+
+
+class FramePipeline:
+    """Capture -> inference -> render pipeline for a HandEffectTracker
+
+    Capture and inference run on their own threads and hand work forward
+    through drop-oldest queues, so a slow stage never makes the camera
+    back up. The render stage is driven by the caller (``next_frame``)
+    because OpenCV windows must be updated from the main thread.
+    """
+
+    def __init__(self, tracker, cap: cv2.VideoCapture, queue_size: int = 2,
+                 pace_fps: Optional[float] = None):
+        self.tracker = tracker
+        self.cap = cap
+        self.pace_fps = pace_fps  # Throttle capture (e.g. video files) to this rate
+
+        self.capture_queue = DropOldestQueue(queue_size)
+        # Frames with a real detection must reach the render stage so the extrapolator sees them
+        self.render_queue = DropOldestQueue(queue_size, keep=lambda item: item[1] is not None)
+        # Squares queued for rendering, the one on screen and the one being prepared
+        tracker.frame_pool.ensure_slots(queue_size + 2)
+        self.stages = {name: StageStats(name) for name in
+                       ('capture', 'inference', 'render', 'end_to_end')}
+
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self) -> None:
+        self._threads = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.capture_queue.close()
+        self.render_queue.close()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+
+    @property
+    def finished(self) -> bool:
+        """True once the source is exhausted and every queued frame was consumed"""
+        return self.render_queue.closed and len(self.render_queue) == 0
+
+    def next_frame(self, timeout: float = 0.5) -> Optional[np.ndarray]:
+        """Render stage: draw the newest inference result, None if nothing arrived"""
+        item = self.render_queue.get(timeout=timeout, latest=True)
+        if item is None:
+            return None
+
+        frame_square, results, frame_dims, captured_at, index, inference_time, stages = item
+        start = time.perf_counter()
+        self.tracker.profiler.merge_stages(stages)
+        detected = results is not None
+        if not detected:
+            # Inference was skipped for this frame (detect-every N)
+            results = self.tracker.extrapolator.predict(frame=index)
+        output = self.tracker._render_results(frame_square, results, frame_dims,
+                                              predicted=not detected)
+        if detected:
+            self.tracker._observe_detection(results, frame=index)
+        done = time.perf_counter()
+        self.stages['render'].record(done - start)
+        self.stages['end_to_end'].record(done - captured_at)
+        self.tracker._record_frame_time(inference_time + done - start)
+        self.tracker.profiler.record_dropped(self.capture_queue.dropped + self.render_queue.dropped)
+        self.tracker.profiler.end_frame(len(self.tracker.hand_points), 0.0)
+        return output
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage timings plus queue drop counters"""
+        stats = {name: stage.snapshot() for name, stage in self.stages.items()}
+        stats['capture']['dropped'] = self.capture_queue.dropped
+        stats['inference']['dropped'] = self.render_queue.dropped
+        return stats
+
+    def _capture_loop(self) -> None:
+        interval = 1.0 / self.pace_fps if self.pace_fps else 0.0
+        next_due = time.perf_counter()
+        index = 0
+        try:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                captured_at = time.perf_counter()
+                self.stages['capture'].record(captured_at - start)
+                self.capture_queue.put((frame, captured_at, index))
+                index += 1
+
+                if interval:
+                    next_due += interval
+                    delay = next_due - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+        finally:
+            self.capture_queue.close()
+
+    def _inference_loop(self) -> None:
+        extrapolator = self.tracker.extrapolator
+        skipped = 0  # Frames skipped since the last detection, counted here since rendering may lag
+        try:
+            while not self._stop.is_set():
+                item = self.capture_queue.get(timeout=0.5)
+                if item is None:
+                    if self.capture_queue.closed:
+                        break
+                    continue
+
+                frame, captured_at, index = item
+                start = time.perf_counter()
+                detect = (extrapolator.should_detect(self.tracker.hand_states)
+                          or skipped + 1 >= extrapolator.interval)
+                skipped = 0 if detect else skipped + 1
+                frame_square, rgb, frame_dims = self.tracker._prepare_frame(frame, need_rgb=detect)
+                # None tells the render stage to extrapolate the landmarks instead
+                results = self.tracker._detect_hands(rgb) if detect else None
+                inference_time = time.perf_counter() - start
+                self.stages['inference'].record(inference_time)
+                # This frame's flip/convert/inference timings travel with it, so frames
+                # dropped before rendering do not add theirs to the next rendered frame
+                stages = self.tracker.profiler.take_stages()
+                self.render_queue.put((frame_square, results, frame_dims, captured_at, index,
+                                       inference_time, stages))
+        finally:
+            self.render_queue.close()
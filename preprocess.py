@@ -0,0 +1,89 @@
+import cv2
+import numpy as np
+from typing import Dict, List, Tuple
+
+
+class FrameBufferPool:
+    """Preallocated destination arrays for camera frame preprocessing
+
+    Produces the same square as flipping the camera frame, resizing it to
+    ``frame_size`` and cropping the centered square, but without the full
+    size intermediate: the region of the camera frame that ends up in the
+    square is cropped first (a view) and resized straight into a reused
+    buffer. Flip and color conversion then run in place / into a reused
+    RGB buffer, so steady-state preprocessing allocates nothing.
+
+    Squares rotate through ``slots`` buffers because a returned square is
+    rendered into and may still be queued (pipelined mode) while the next
+    frame is prepared; a square stays valid for ``slots - 1`` more calls.
+    """
+
+    def __init__(self, frame_size: Tuple[int, int] = (960, 720), slots: int = 2):
+        self.frame_size = frame_size                  # (width, height) of the virtual resize
+        width, height = frame_size
+        self.square_size = min(width, height)
+        self.frame_dims = (height, width)
+
+        self._squares: List[np.ndarray] = []
+        self._next_slot = 0
+        self._rgb = np.empty((self.square_size, self.square_size, 3), dtype=np.uint8)
+        self._scaled: Dict[int, np.ndarray] = {}
+        self._roi = np.empty(0, dtype=np.uint8)       # Flat, so any crop side gets a contiguous view
+        self._crops: Dict[Tuple[int, int], Tuple[slice, slice]] = {}
+        self.ensure_slots(slots)
+
+    def ensure_slots(self, slots: int) -> None:
+        """Keep at least ``slots`` square buffers in rotation"""
+        while len(self._squares) < slots:
+            self._squares.append(np.empty((self.square_size, self.square_size, 3), dtype=np.uint8))
+
+    def square(self, frame: np.ndarray) -> np.ndarray:
+        """Mirrored, resized, center-cropped BGR square of a camera frame"""
+        square = self._squares[self._next_slot]
+        self._next_slot = (self._next_slot + 1) % len(self._squares)
+
+        rows, cols = self._crop_for(frame.shape[:2])
+        cv2.resize(frame[rows, cols], (self.square_size, self.square_size), dst=square)
+        cv2.flip(square, 1, dst=square)
+        return square
+
+    def to_rgb(self, square: np.ndarray) -> np.ndarray:
+        """RGB copy of a square for inference (one shared buffer, use before the next call)"""
+        cv2.cvtColor(square, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return self._rgb
+
+    def downscale(self, image: np.ndarray, size: int) -> np.ndarray:
+        """Area-downscale a square image into a reused ``size`` x ``size`` buffer"""
+        scaled = self._scaled.get(size)
+        if scaled is None:
+            scaled = self._scaled[size] = np.empty((size, size) + image.shape[2:], dtype=image.dtype)
+        cv2.resize(image, (size, size), dst=scaled, interpolation=cv2.INTER_AREA)
+        return scaled
+
+    def crop(self, image: np.ndarray, x0: int, y0: int, side: int, max_size: int) -> np.ndarray:
+        """Contiguous copy of a square crop in a reused buffer, area-downscaled to ``max_size`` if larger"""
+        size = min(side, max_size)
+        needed = size * size * image.shape[2]
+        if self._roi.size < needed:
+            self._roi = np.empty(needed, dtype=image.dtype)
+        roi = self._roi[:needed].reshape(size, size, image.shape[2])
+        region = image[y0:y0 + side, x0:x0 + side]
+        if side > max_size:
+            cv2.resize(region, (size, size), dst=roi, interpolation=cv2.INTER_AREA)
+        else:
+            np.copyto(roi, region)
+        return roi
+
+    def _crop_for(self, shape: Tuple[int, int]) -> Tuple[slice, slice]:
+        """Source rows/columns that map onto the output square, cached per input size"""
+        crop = self._crops.get(shape)
+        if crop is None:
+            src_h, src_w = shape
+            width, height = self.frame_size
+            crop_w = round(self.square_size * src_w / width)
+            crop_h = round(self.square_size * src_h / height)
+            # Centered in the mirrored frame, i.e. mirrored position in the original
+            x0 = src_w - (src_w - crop_w) // 2 - crop_w
+            y0 = (src_h - crop_h) // 2
+            crop = self._crops[shape] = (slice(y0, y0 + crop_h), slice(x0, x0 + crop_w))
+        return crop
@@ -0,0 +1,90 @@
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+
+class QualityTier(NamedTuple):
+    """One step of the quality ladder, from best to cheapest"""
+    name: str
+    inference_size: int        # Side of the square image fed to MediaPipe
+    model_complexity: int      # MediaPipe Hands model (1 = full, 0 = lite)
+    trail_shadow_passes: int   # 1-3 passes, the main trail is always drawn
+    effect_scale: float        # Multiplier applied to effect sprite size
+
+
+DEFAULT_TIERS = (
+    QualityTier("high", 720, 1, 3, 1.0),
+    QualityTier("medium", 480, 1, 2, 1.0),
+    QualityTier("low", 360, 0, 1, 0.85),
+    QualityTier("minimal", 256, 0, 1, 0.7),
+)
+
+
+class QualityGovernor:
+    """Frame-budget governor that steps through quality tiers to hold a target FPS
+
+    Frame times are smoothed with an exponential moving average. The tier
+    drops after ``downgrade_frames`` consecutive frames over budget and
+    rises only after ``upgrade_frames`` consecutive frames comfortably under
+    it (``upgrade_headroom`` of the budget), so it does not oscillate.
+    """
+
+    def __init__(self, target_fps: float = 30.0, tiers: Sequence[QualityTier] = DEFAULT_TIERS,
+                 smoothing: float = 0.1, downgrade_frames: int = 15, upgrade_frames: int = 90,
+                 upgrade_headroom: float = 0.75,
+                 on_change: Optional[Callable[[QualityTier, QualityTier, float], None]] = None):
+        self.target_fps = target_fps
+        self.budget = 1.0 / target_fps
+        self.tiers = list(tiers)
+        self.smoothing = smoothing
+        self.downgrade_frames = downgrade_frames
+        self.upgrade_frames = upgrade_frames
+        self.upgrade_headroom = upgrade_headroom
+        self.on_change = on_change
+
+        self.level = 0
+        self.avg_frame_time = None
+        self._over_budget = 0
+        self._under_budget = 0
+        self.transitions: List[Dict] = []
+
+    @property
+    def tier(self) -> QualityTier:
+        return self.tiers[self.level]
+
+    def record(self, frame_seconds: float) -> Optional[QualityTier]:
+        """Feed one frame's processing time; returns the new tier if it changed"""
+        if self.avg_frame_time is None:
+            self.avg_frame_time = frame_seconds
+        else:
+            self.avg_frame_time += self.smoothing * (frame_seconds - self.avg_frame_time)
+
+        if self.avg_frame_time > self.budget:
+            self._over_budget += 1
+            self._under_budget = 0
+        elif self.avg_frame_time < self.budget * self.upgrade_headroom:
+            self._under_budget += 1
+            self._over_budget = 0
+        else:
+            self._over_budget = self._under_budget = 0
+
+        if self._over_budget >= self.downgrade_frames and self.level < len(self.tiers) - 1:
+            return self._step(+1)
+        if self._under_budget >= self.upgrade_frames and self.level > 0:
+            return self._step(-1)
+        return None
+
+    def _step(self, direction: int) -> QualityTier:
+        previous = self.tier
+        self.level += direction
+        self._over_budget = self._under_budget = 0
+
+        fps = 1.0 / self.avg_frame_time if self.avg_frame_time else 0.0
+        self.transitions.append({
+            'time': time.time(),
+            'from': previous.name,
+            'to': self.tier.name,
+            'fps': fps,
+        })
+        if self.on_change is not None:
+            self.on_change(previous, self.tier, fps)
+        return self.tier
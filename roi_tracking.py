@@ -0,0 +1,98 @@
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+from landmarks import HandDetections, landmarks_to_array
+from preprocess import FrameBufferPool
+
+# (x0, y0, side) of a square crop in pixels of the processed square frame
+RoiBox = Tuple[int, int, int]
+
+
+class HandRoiTracker:
+    """Feeds MediaPipe a padded crop around the hands tracked in the previous frame
+
+    All tracked hands share one square crop (the union of their padded
+    boxes) so a single ``Hands`` instance keeps consistent tracking state.
+    A full-frame pass runs every ``full_frame_interval`` frames, whenever
+    nothing is tracked, when the crop would cover most of the frame, and
+    when the crop pass finds fewer hands than were tracked. Crops are
+    copied into ``pool``'s reused ROI buffer.
+    """
+
+    def __init__(self, padding: float = 0.35, full_frame_interval: int = 30,
+                 max_size: int = 256, min_size: int = 128, max_area: float = 0.6,
+                 pool: Optional[FrameBufferPool] = None):
+        self.padding = padding                      # Box growth per side, relative to hand extent
+        self.full_frame_interval = full_frame_interval
+        self.max_size = max_size                    # Crops larger than this are downscaled
+        self.min_size = min_size                    # Keep some context around small hands
+        self.max_area = max_area                    # Crop/frame area ratio above which we use full frame
+        self.pool = pool if pool is not None else FrameBufferPool()
+
+        self._prev_points = landmarks_to_array(None)
+        self._frames_since_full = 0
+        self.roi_passes = 0
+        self.full_passes = 0
+        self.lost = 0
+
+    def reset(self) -> None:
+        self._prev_points = landmarks_to_array(None)
+        self._frames_since_full = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {'roi_passes': self.roi_passes, 'full_passes': self.full_passes, 'lost': self.lost}
+
+    def process(self, hands, rgb: np.ndarray) -> HandDetections:
+        """Run ``hands.process`` on the ROI (or full frame) and return full-frame landmarks"""
+        frame_size = rgb.shape[0]
+        box = self._select_box(frame_size)
+
+        if box is not None:
+            x0, y0, side = box
+            results = hands.process(self.pool.crop(rgb, x0, y0, side, self.max_size))
+            points = landmarks_to_array(results.multi_hand_landmarks)
+
+            if len(points) >= len(self._prev_points):
+                self.roi_passes += 1
+                self._frames_since_full += 1
+                points = self._to_full_frame(points, box, frame_size)
+                self._prev_points = points
+                return HandDetections(points, results.multi_handedness)
+            self.lost += 1  # Tracking lost inside the crop, redo on the full frame
+
+        self.full_passes += 1
+        self._frames_since_full = 0
+        results = hands.process(rgb)
+        self._prev_points = landmarks_to_array(results.multi_hand_landmarks)
+        return HandDetections(self._prev_points, results.multi_handedness)
+
+    def _select_box(self, frame_size: int) -> Optional[RoiBox]:
+        """Square crop around the previous landmarks, or None for a full-frame pass"""
+        if len(self._prev_points) == 0 or self._frames_since_full >= self.full_frame_interval:
+            return None
+
+        xy = self._prev_points[:, :, :2]
+        lo = xy.min(axis=1)
+        hi = xy.max(axis=1)
+        pad = (hi - lo).max(axis=1, keepdims=True) * self.padding
+        lo = (lo - pad).min(axis=0) * frame_size
+        hi = (hi + pad).max(axis=0) * frame_size
+
+        side = max(self.min_size, int(np.ceil((hi - lo).max())))
+        if side * side > self.max_area * frame_size * frame_size:
+            return None
+
+        # Center the square on the hands and keep it inside the frame
+        center = (lo + hi) / 2
+        x0 = int(np.clip(center[0] - side / 2, 0, frame_size - side))
+        y0 = int(np.clip(center[1] - side / 2, 0, frame_size - side))
+        return x0, y0, side
+
+    def _to_full_frame(self, points: np.ndarray, box: RoiBox, frame_size: int) -> np.ndarray:
+        """Map crop-normalized landmarks back to full-frame normalized coordinates"""
+        x0, y0, side = box
+        scale = side / frame_size
+        mapped = points * scale
+        mapped[:, :, 0] += x0 / frame_size
+        mapped[:, :, 1] += y0 / frame_size
+        return mapped
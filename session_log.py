@@ -0,0 +1,281 @@
+"""Record and replay hand landmark sessions
+
+A session file stores, per rendered frame, the detected landmarks and
+handedness plus a timestamp, in a columnar binary layout. Frames on which
+detection was skipped (``--detect-every``) are flagged as predicted and
+store no hands; replay extrapolates them again::
+
+    b"HANDLOG1" | uint32 header size | JSON header | columns (64-byte aligned)
+
+The JSON header describes each column (dtype, shape, byte offset), so a
+column opens as a read-only ``np.memmap`` without parsing the rest:
+
+    frame_times   float64 (frames,)          seconds since recording started
+    predicted     uint8   (frames,)          1 if inference was skipped on the frame
+    hand_offsets  int64   (frames + 1,)      hands of frame i: [off[i], off[i + 1])
+    landmarks     float32 (hands, 21, 3)     normalized, like MediaPipe's output
+    handedness    uint8   (hands,)           0 unknown, 1 Left, 2 Right
+
+Replay a session (no camera, no MediaPipe), optionally over the original video:
+
+    python session_log.py sesi.hlog --output hasil.mp4 --set max_effect_size=300
+"""
+import argparse
+import ast
+import json
+import os
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from landmarks import NUM_LANDMARKS, HandDetections
+
+MAGIC = b"HANDLOG1"
+ALIGNMENT = 64
+HANDEDNESS_CODES = {None: 0, 'Left': 1, 'Right': 2}
+HANDEDNESS_LABELS = {code: label for label, code in HANDEDNESS_CODES.items()}
+
+# Column name -> (dtype, per-row shape); rows are frames or hands
+FRAME_COLUMNS = {'frame_times': ('<f8', ()), 'predicted': ('u1', ())}
+HAND_COLUMNS = {'landmarks': ('<f4', (NUM_LANDMARKS, 3)), 'handedness': ('u1', ())}
+
+
+class SessionRecorder:
+    """Streams per-frame landmarks to spool files, packed into one session file on close"""
+
+    def __init__(self, path: str, metadata: Optional[Dict] = None):
+        self.path = path
+        self.metadata = dict(metadata or {})
+        self.metadata.setdefault('started_at', time.time())
+        self.frames = 0
+        self.hands = 0
+
+        self._start = time.perf_counter()
+        self._counts: List[int] = []
+        self._spools = {name: open(self._spool_path(name), "wb")
+                        for name in list(FRAME_COLUMNS) + list(HAND_COLUMNS)}
+
+    def write(self, points: np.ndarray, labels: Sequence[Optional[str]],
+              timestamp: Optional[float] = None, predicted: bool = False) -> None:
+        """Append one frame: (n, 21, 3) landmarks and n handedness labels
+
+        A ``predicted`` frame (inference skipped) is stored as a flag without hands.
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter() - self._start
+        count = 0 if predicted else len(points)
+        self._spools['frame_times'].write(np.float64(timestamp).tobytes())
+        self._spools['predicted'].write(bytes([predicted]))
+        if count:
+            self._spools['landmarks'].write(np.asarray(points, dtype='<f4').tobytes())
+            codes = [HANDEDNESS_CODES.get(label, 0) for label in labels[:count]]
+            codes += [0] * (count - len(codes))
+            self._spools['handedness'].write(bytes(codes))
+        self._counts.append(count)
+        self.frames += 1
+        self.hands += count
+
+    def close(self) -> None:
+        """Pack the spooled columns into the session file (atomically) and remove the spools"""
+        if self._spools is None:
+            return
+        for spool in self._spools.values():
+            spool.close()
+
+        offsets = np.zeros(self.frames + 1, dtype='<i8')
+        np.cumsum(self._counts, out=offsets[1:])
+        columns = {'hand_offsets': (offsets.dtype.str, offsets.shape)}
+        for name, (dtype, shape) in FRAME_COLUMNS.items():
+            columns[name] = (dtype, (self.frames,) + shape)
+        for name, (dtype, shape) in HAND_COLUMNS.items():
+            columns[name] = (dtype, (self.hands,) + shape)
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                header, layout = self._header(columns)
+                f.write(MAGIC + np.uint32(len(header)).astype('<u4').tobytes() + header)
+                for name, column in layout.items():
+                    f.write(b"\0" * (column['offset'] - f.tell()))
+                    if name == 'hand_offsets':
+                        f.write(offsets.tobytes())
+                    else:
+                        with open(self._spool_path(name), "rb") as spool:
+                            while True:
+                                chunk = spool.read(1 << 20)
+                                if not chunk:
+                                    break
+                                f.write(chunk)
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            for name in self._spools:
+                os.remove(self._spool_path(name))
+            self._spools = None
+        print(f"Recorded {self.frames} frames ({self.hands} hands) to {self.path}")
+
+    def _spool_path(self, column: str) -> str:
+        return f"{self.path}.{column}.spool"
+
+    def _header(self, columns: Dict):
+        """JSON header and column layout (byte offsets follow the header)"""
+        # The header size depends on the offsets, so grow the estimate until it fits
+        data_start = ALIGNMENT
+        while True:
+            layout, offset = {}, data_start
+            for name, (dtype, shape) in columns.items():
+                layout[name] = {'dtype': dtype, 'shape': list(shape), 'offset': offset}
+                size = int(np.prod(shape, dtype=np.int64)) * np.dtype(dtype).itemsize
+                offset += -(-size // ALIGNMENT) * ALIGNMENT
+            header = json.dumps({'version': 2, 'frames': self.frames,
+                                 'metadata': self.metadata, 'columns': layout}).encode()
+            if len(MAGIC) + 4 + len(header) <= data_start:
+                return header, layout
+            data_start = -(-(len(MAGIC) + 4 + len(header)) // ALIGNMENT) * ALIGNMENT
+
+
+class SessionLog:
+    """Read-only view of a recorded session; every column is a NumPy memory map"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a hand session file: {path}")
+            header_size = int(np.frombuffer(f.read(4), dtype='<u4')[0])
+            header = json.loads(f.read(header_size))
+
+        self.metadata: Dict = header.get('metadata', {})
+        self.columns: Dict[str, np.ndarray] = {}
+        for name, column in header['columns'].items():
+            shape = tuple(column['shape'])
+            if 0 in shape:
+                self.columns[name] = np.empty(shape, dtype=column['dtype'])
+            else:
+                self.columns[name] = np.memmap(path, dtype=column['dtype'], mode='r',
+                                               offset=column['offset'], shape=shape)
+
+        self.frame_times = self.columns['frame_times']
+        # Version 1 files predate the predicted flag: every frame was a detection
+        self.predicted = self.columns.get('predicted', np.zeros(len(self.frame_times), dtype='u1'))
+        self.hand_offsets = self.columns['hand_offsets']
+        self.landmarks = self.columns['landmarks']
+        self.handedness = self.columns['handedness']
+
+    def __len__(self) -> int:
+        return len(self.frame_times)
+
+    def __getitem__(self, index: int) -> HandDetections:
+        """Detections of one frame, in the form ``_render_results`` accepts"""
+        start, end = int(self.hand_offsets[index]), int(self.hand_offsets[index + 1])
+        if start == end:
+            return HandDetections(None, None)
+        labels = [HANDEDNESS_LABELS.get(int(code)) for code in self.handedness[start:end]]
+        return HandDetections(np.asarray(self.landmarks[start:end]), labels)
+
+    def __iter__(self) -> Iterator[HandDetections]:
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def fps(self) -> float:
+        """Recorded frame rate (median frame interval), 30 if unknown"""
+        if len(self.frame_times) < 2:
+            return 30.0
+        interval = float(np.median(np.diff(self.frame_times)))
+        return 1.0 / interval if interval > 0 else 30.0
+
+
+def replay_session(tracker, log: SessionLog, background: Optional[cv2.VideoCapture] = None,
+                   frame_size=(720, 960)) -> Iterator[np.ndarray]:
+    """Render each recorded frame through ``tracker`` without running MediaPipe
+
+    Frames of ``background`` (e.g. the original video) are used as the
+    camera image when given; otherwise effects are drawn on a black frame.
+    Predicted frames are extrapolated from the replayed detections, as
+    they were live.
+    """
+    blank = np.zeros(frame_size + (3,), dtype=np.uint8)
+    for index, detections in enumerate(log):
+        predicted = bool(log.predicted[index])
+        frame = blank
+        if background is not None:
+            ret, frame = background.read()
+            if not ret:
+                background, frame = None, blank
+        frame_square, _, frame_dims = tracker._prepare_frame(frame, need_rgb=False)
+        if predicted:
+            detections = tracker.extrapolator.predict()
+        output = tracker._render_results(frame_square, detections, frame_dims, predicted=predicted)
+        if not predicted:
+            tracker._observe_detection(detections)
+        yield output
+
+
+def _parse_override(text: str):
+    key, _, value = text.partition("=")
+    try:
+        return key, ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return key, value
+
+
+def main():
+    """Command line entry point for replaying a recorded session"""
+    parser = argparse.ArgumentParser(description="Replay a recorded hand landmark session")
+    parser.add_argument("session", help="Session file written by main.py --record")
+    parser.add_argument("--video", default=None,
+                        help="Video to draw on (e.g. the original recording); default black")
+    parser.add_argument("--output", default=None,
+                        help="Write the rendered frames to this video instead of showing them")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="Override a tracker config entry, e.g. --set max_effect_size=300")
+    parser.add_argument("--effects", default="effects", help="Effects folder")
+    args = parser.parse_args()
+
+    from main import HandEffectTracker
+
+    log = SessionLog(args.session)
+    tracker = HandEffectTracker(args.effects)
+    tracker.hands.close()  # Landmarks come from the session, not MediaPipe
+    for override in args.set:
+        key, value = _parse_override(override)
+        if key not in tracker.config:
+            parser.error(f"Unknown config key: {key}")
+        tracker.config[key] = value
+
+    background = cv2.VideoCapture(args.video) if args.video else None
+    writer = None
+    if args.output:
+        import imageio
+        writer = imageio.get_writer(args.output, fps=log.fps, codec='libx264', quality=8)
+
+    start = time.perf_counter()
+    rendered = 0
+    try:
+        for output in replay_session(tracker, log, background):
+            rendered += 1
+            if writer is not None:
+                writer.append_data(cv2.cvtColor(output, cv2.COLOR_BGR2RGB))
+                continue
+            cv2.imshow("Hand Effects - replay", output)
+            key = cv2.waitKey(max(1, int(1000 / log.fps))) & 0xFF
+            if key == 27 or key == ord('q'):
+                break
+    finally:
+        if writer is not None:
+            writer.close()
+        if background is not None:
+            background.release()
+        cv2.destroyAllWindows()
+
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {rendered}/{len(log)} frames in {elapsed:.1f}s "
+          f"({rendered / elapsed if elapsed > 0 else 0.0:.1f} fps)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""Output sinks for processed frames
+
+A sink receives every processed frame through ``write(frame)`` from the
+processing loop and must not hold it up (an EncoderSink for a video file
+may wait, see ``block``). Both sinks count dropped frames and latency,
+reported by ``stats()``.
+
+SharedMemorySink publishes frames into a ring of slots in a
+``multiprocessing.shared_memory`` block that other local processes map
+directly (see SharedMemoryReader)::
+
+    header (64 bytes): magic, slot count, height, width, channels, closed flag, latest sequence
+    slot i: sequence (uint64), timestamp (float64), padding to 64, frame bytes
+
+A slot's sequence is zeroed while it is being written, so a reader can
+detect (and retry) a frame that was overwritten under it. View a running
+tracker's frames from another process:
+
+    python main.py --shm hand_effects --no-window
+    python sinks.py hand_effects
+"""
+import argparse
+import collections
+import struct
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from pipeline import DropOldestQueue, StageStats
+
+SHM_MAGIC = 0x48414E44  # "HAND"
+HEADER_FORMAT = "<IIIIIIQ"             # magic, slots, height, width, channels, closed, latest sequence
+HEADER_SIZE = 64
+CLOSED_OFFSET = 20
+SEQUENCE_OFFSET = 24
+SLOT_HEADER_SIZE = 64                  # sequence (uint64) + timestamp (float64), padded
+
+_published_blocks = set()              # Shared memory names created by sinks in this process
+
+
+class FrameSink:
+    """Base class: counters shared by every sink"""
+
+    name = "sink"
+
+    def __init__(self):
+        self.frames = 0
+        self.dropped = 0
+        self.latency = StageStats('latency')
+
+    def write(self, frame: np.ndarray) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, float]:
+        latency = self.latency.snapshot()
+        return {'frames': self.frames, 'dropped': self.dropped,
+                'latency_avg_ms': latency['avg_ms'], 'latency_max_ms': latency['max_ms']}
+
+    def describe(self) -> str:
+        stats = self.stats()
+        return (f"{self.name}: {stats['frames']} frames, dropped {stats['dropped']}, "
+                f"latency avg {stats['latency_avg_ms']:.2f} ms, max {stats['latency_max_ms']:.2f} ms")
+
+
+def _slot_stride(shape: Tuple[int, int, int]) -> int:
+    return SLOT_HEADER_SIZE + -(-int(np.prod(shape)) // 64) * 64
+
+
+class SharedMemorySink(FrameSink):
+    """Publishes frames into a shared-memory ring buffer for other local processes
+
+    Writing is one copy into the next slot; the writer never waits for
+    readers. Frames with a different shape than the ring are dropped.
+    Latency is the time spent publishing a frame.
+    """
+
+    name = "shared memory"
+
+    def __init__(self, shm_name: str, shape: Tuple[int, int, int] = (720, 720, 3), slots: int = 4):
+        super().__init__()
+        self.shape = tuple(shape)
+        self.slots = max(2, slots)
+        self.stride = _slot_stride(self.shape)
+        try:
+            self.shm = shared_memory.SharedMemory(name=shm_name, create=True,
+                                                  size=HEADER_SIZE + self.slots * self.stride)
+        except FileExistsError:
+            raise FileExistsError(
+                f"Shared memory '{shm_name}' already exists: another tracker is publishing there, "
+                f"or a crashed one left it behind (on Linux remove /dev/shm/{shm_name})") from None
+        _published_blocks.add(shm_name)
+        self.sequence = 0
+        self._header = np.ndarray((1,), dtype='<u8', buffer=self.shm.buf, offset=SEQUENCE_OFFSET)
+        self._slot_sequences = []
+        self._slot_times = []
+        self._slot_frames = []
+        for slot in range(self.slots):
+            base = HEADER_SIZE + slot * self.stride
+            self._slot_sequences.append(np.ndarray((1,), dtype='<u8', buffer=self.shm.buf, offset=base))
+            self._slot_times.append(np.ndarray((1,), dtype='<f8', buffer=self.shm.buf, offset=base + 8))
+            self._slot_frames.append(np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf,
+                                                offset=base + SLOT_HEADER_SIZE))
+        struct.pack_into(HEADER_FORMAT, self.shm.buf, 0, SHM_MAGIC, self.slots, *self.shape, 0, 0)
+
+    def write(self, frame: np.ndarray) -> None:
+        if frame.shape != self.shape:
+            self.dropped += 1
+            return
+        start = time.perf_counter()
+        self.sequence += 1
+        slot = self.sequence % self.slots
+        self._slot_sequences[slot][0] = 0             # Mark the slot as being written
+        np.copyto(self._slot_frames[slot], frame)
+        self._slot_times[slot][0] = time.time()
+        self._slot_sequences[slot][0] = self.sequence
+        self._header[0] = self.sequence               # Publish
+        self.frames += 1
+        self.latency.record(time.perf_counter() - start)
+
+    def close(self) -> None:
+        struct.pack_into("<I", self.shm.buf, CLOSED_OFFSET, 1)   # Tell readers no more frames will come
+        # Views into the block must go before it can be closed
+        self._header = self._slot_sequences = self._slot_times = self._slot_frames = None
+        self.shm.close()
+        self.shm.unlink()
+        _published_blocks.discard(self.shm.name)
+
+
+class SharedMemoryReader:
+    """Reads the newest frame published by a SharedMemorySink (possibly in another process)"""
+
+    def __init__(self, shm_name: str):
+        self.shm = shared_memory.SharedMemory(name=shm_name)
+        if shm_name not in _published_blocks:
+            # Attaching registers the block with this process's resource tracker, which
+            # would unlink it at exit; only the publishing sink owns it
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        magic, self.slots, height, width, channels, _, _ = struct.unpack_from(HEADER_FORMAT, self.shm.buf, 0)
+        if magic != SHM_MAGIC:
+            self.shm.close()
+            raise ValueError(f"Shared memory block '{shm_name}' is not a frame ring")
+        self.shape = (height, width, channels)
+        self.stride = _slot_stride(self.shape)
+        self.last_sequence = 0
+        self.frames = 0
+        self.missed = 0          # Published frames this reader never saw
+        self.torn = 0            # Reads retried because the writer overwrote the slot
+        self.latency = StageStats('latency')
+
+    @property
+    def closed(self) -> bool:
+        """True once the publisher has closed the sink"""
+        return struct.unpack_from("<I", self.shm.buf, CLOSED_OFFSET)[0] == 1
+
+    def read(self, out: Optional[np.ndarray] = None) -> Optional[Tuple[int, float, np.ndarray]]:
+        """(sequence, publish time, frame) of the newest unseen frame, None if there is none"""
+        for _ in range(3):
+            sequence = struct.unpack_from("<Q", self.shm.buf, SEQUENCE_OFFSET)[0]
+            if sequence == 0 or sequence == self.last_sequence:
+                return None
+            base = HEADER_SIZE + (sequence % self.slots) * self.stride
+            frame = np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf,
+                               offset=base + SLOT_HEADER_SIZE)
+            if out is None:
+                out = np.empty(self.shape, dtype=np.uint8)
+            np.copyto(out, frame)
+            del frame
+            slot_sequence, timestamp = struct.unpack_from("<Qd", self.shm.buf, base)
+            if slot_sequence == sequence:
+                if self.last_sequence:
+                    self.missed += sequence - self.last_sequence - 1
+                self.last_sequence = sequence
+                self.frames += 1
+                self.latency.record(max(0.0, time.time() - timestamp))
+                return sequence, timestamp, out
+            self.torn += 1
+        return None
+
+    def stats(self) -> Dict[str, float]:
+        latency = self.latency.snapshot()
+        return {'frames': self.frames, 'missed': self.missed, 'torn': self.torn,
+                'latency_avg_ms': latency['avg_ms'], 'latency_max_ms': latency['max_ms']}
+
+    def close(self) -> None:
+        self.shm.close()
+
+
+class EncoderSink(FrameSink):
+    """Encodes frames to a video file with imageio-ffmpeg on a background thread
+
+    ``write`` only converts the frame to RGB into a pooled buffer and queues
+    it; when the encoder falls behind, the oldest queued frame is dropped
+    (its buffer goes back to the pool). With ``block`` ``write`` waits for
+    the encoder instead, which suits sources without a live deadline such
+    as video files, where dropping would shorten the output. Latency runs
+    from ``write`` until the frame has been handed to ffmpeg.
+    """
+
+    name = "encoder"
+
+    def __init__(self, path: str, fps: float = 30.0, queue_size: int = 8,
+                 codec: str = 'libx264', quality: int = 8, block: bool = False):
+        super().__init__()
+        self.block = block
+        import imageio
+        self.path = path
+        self.writer = imageio.get_writer(path, fps=fps, codec=codec, quality=quality)
+        self.queue = DropOldestQueue(queue_size)
+        self._free = collections.deque()               # RGB buffers ready for reuse
+        self._thread = threading.Thread(target=self._encode_loop, name="encoder", daemon=True)
+        self._thread.start()
+
+    def write(self, frame: np.ndarray) -> None:
+        buffer = self._free.popleft() if self._free else None
+        if buffer is None or buffer.shape != frame.shape:
+            buffer = np.empty(frame.shape, dtype=np.uint8)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=buffer)
+        evicted = self.queue.put((buffer, time.perf_counter()), block=self.block)
+        if evicted is not None:
+            self._free.append(evicted[0])
+        self.dropped = self.queue.dropped
+
+    def close(self) -> None:
+        """Encode everything still queued, then finalize the file"""
+        self.queue.close()
+        self._thread.join()
+        self.writer.close()
+        if self.dropped:
+            print(f"Warning: encoder dropped {self.dropped} of {self.frames + self.dropped} frames, "
+                  f"so {self.path} is shorter than the source")
+
+    def _encode_loop(self) -> None:
+        while True:
+            item = self.queue.get(timeout=0.5)
+            if item is None:
+                if self.queue.closed:
+                    break
+                continue
+            buffer, queued_at = item
+            self.writer.append_data(buffer)
+            self.frames += 1
+            self.latency.record(time.perf_counter() - queued_at)
+            self._free.append(buffer)
+
+
+def main():
+    """Show (or just count) the frames another process publishes with ``main.py --shm NAME``"""
+    parser = argparse.ArgumentParser(description="Read frames from a shared-memory frame sink")
+    parser.add_argument("name", help="Shared memory name given to main.py --shm")
+    parser.add_argument("--no-window", action="store_true",
+                        help="Only count frames and report drops/latency")
+    args = parser.parse_args()
+
+    reader = SharedMemoryReader(args.name)
+    print(f"Reading {reader.shape[1]}x{reader.shape[0]} frames from '{args.name}', "
+          f"press ESC or 'q' to quit")
+    frame = np.empty(reader.shape, dtype=np.uint8)
+    try:
+        while True:
+            if reader.read(frame) is None:
+                if reader.closed:
+                    break
+                time.sleep(0.001)
+                if args.no_window:
+                    continue
+            elif args.no_window:
+                continue
+            cv2.imshow(f"Shared memory - {args.name}", frame)
+            key = cv2.waitKey(1) & 0xFF
+            if key == 27 or key == ord('q'):
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stats = reader.stats()
+        print(f"Read {stats['frames']} frames, missed {stats['missed']}, torn {stats['torn']}, "
+              f"latency avg {stats['latency_avg_ms']:.2f} ms, max {stats['latency_max_ms']:.2f} ms")
+        reader.close()
+        cv2.destroyAllWindows()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import cv2
+import numpy as np
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Tuple, Union
+
+from compositing import PremultipliedSprite, premultiply
+
+BOX_PADDING = 1  # Transparent border kept around each box so edge samples stay transparent
+
+
+class AtlasFrame(NamedTuple):
+    """Opaque part of one effect frame, stored in a SpriteAtlas"""
+    pixels: np.ndarray               # (h, w, 4) RGBA view into the atlas buffer
+    x: int                           # Box origin in the full source frame
+    y: int
+    source_size: Tuple[int, int]     # (height, width) of the full source frame
+
+
+class SpriteAtlas:
+    """Frames of several effects packed into one contiguous RGBA buffer
+
+    Each frame is cropped to the bounding box of its non-transparent pixels
+    before packing, so transparent GIF margins cost neither memory nor
+    blending time. Frames are views into a single flat ``uint8`` buffer.
+    """
+
+    def __init__(self, effects: Mapping[str, Dict], names: Iterable[str]):
+        plans: Dict[str, List[Tuple[int, int, int, int]]] = {}
+        sources: Dict[str, np.ndarray] = {}
+        for name in dict.fromkeys(names):
+            try:
+                frames = effects[name]["frames"]
+            except KeyError:
+                print(f"Warning: effect '{name}' not found, skipping it in the sprite atlas")
+                continue
+            sources[name] = frames
+            plans[name] = [self._opaque_box(frame) for frame in frames]
+
+        total = sum(w * h * 4 for boxes in plans.values() for _, _, w, h in boxes)
+        self.buffer = np.empty(total, dtype=np.uint8)
+        self.source_bytes = 0
+        self._frames: Dict[str, List[AtlasFrame]] = {}
+
+        offset = 0
+        for name, boxes in plans.items():
+            packed = []
+            for frame, (x, y, w, h) in zip(sources[name], boxes):
+                pixels = self.buffer[offset:offset + w * h * 4].reshape(h, w, 4)
+                pixels[...] = frame[y:y + h, x:x + w]
+                packed.append(AtlasFrame(pixels, x, y, frame.shape[:2]))
+                offset += w * h * 4
+                self.source_bytes += frame.nbytes
+            self._frames[name] = packed
+
+    def __contains__(self, name) -> bool:
+        return name in self._frames
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def frames(self, name: str) -> List[AtlasFrame]:
+        return self._frames[name]
+
+    @property
+    def nbytes(self) -> int:
+        return self.buffer.nbytes
+
+    @staticmethod
+    def _opaque_box(frame: np.ndarray) -> Tuple[int, int, int, int]:
+        """Padded (x, y, w, h) box around pixels with non-zero alpha; empty if none"""
+        if frame.shape[2] < 4:
+            return 0, 0, frame.shape[1], frame.shape[0]
+        x, y, w, h = cv2.boundingRect(np.ascontiguousarray(frame[:, :, 3]))
+        if w == 0 or h == 0:
+            return 0, 0, 0, 0
+        x0, y0 = max(0, x - BOX_PADDING), max(0, y - BOX_PADDING)
+        x1 = min(frame.shape[1], x + w + BOX_PADDING)
+        y1 = min(frame.shape[0], y + h + BOX_PADDING)
+        return x0, y0, x1 - x0, y1 - y0
+
+
+def scale_sprite(frame: Union[AtlasFrame, np.ndarray], size: int) -> PremultipliedSprite:
+    """Premultiplied sprite for a frame stretched to a ``size`` x ``size`` square
+
+    For atlas frames only the opaque box is scaled; the sprite's ``offset``
+    says where that box sits inside the square.
+    """
+    if not isinstance(frame, AtlasFrame):
+        return premultiply(cv2.resize(frame, (size, size), interpolation=cv2.INTER_LINEAR))
+
+    src_h, src_w = frame.source_size
+    box_h, box_w = frame.pixels.shape[:2]
+    left, top = frame.x * size // src_w, frame.y * size // src_h
+    right = min(size, -(-(frame.x + box_w) * size // src_w))
+    bottom = min(size, -(-(frame.y + box_h) * size // src_h))
+    if right <= left or bottom <= top or box_w == 0 or box_h == 0:
+        return PremultipliedSprite(np.empty((0, 0, 3), dtype=np.uint8), None)
+
+    # Resize the box inside an otherwise transparent full frame, so every pixel is
+    # interpolated exactly as resizing the original frame would
+    canvas = np.zeros((src_h, src_w, 4), dtype=np.uint8)
+    canvas[frame.y:frame.y + box_h, frame.x:frame.x + box_w] = frame.pixels
+    scaled = cv2.resize(canvas, (size, size), interpolation=cv2.INTER_LINEAR)[top:bottom, left:right]
+    sprite = premultiply(scaled)
+    sprite.offset = (left, top)
+    return sprite
@@ -0,0 +1,103 @@
+import cv2
+import numpy as np
+import collections
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+SpriteKey = Tuple[str, int, int]
+
+
+class EffectSpriteCache:
+    """LRU cache of effect frames pre-scaled to square sprite sizes
+
+    Safe to share between trackers running on different threads; resizing
+    happens outside the lock, so two threads may occasionally scale the
+    same sprite on a cold miss.
+    """
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024, size_step: int = 4,
+                 min_size: int = 40, max_size: int = 400,
+                 scale: Optional[Callable[[Any, int], Any]] = None):
+        self.max_bytes = max_bytes
+        self.size_step = max(1, size_step)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.scale = scale            # Optional scale(frame, size) replacing the plain resize
+
+        # OrderedDict keeps recency order: oldest entry first
+        self._sprites: "collections.OrderedDict[SpriteKey, Any]" = collections.OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def bucket(self, size: int) -> int:
+        """Snap a requested effect size to its cache bucket"""
+        size = max(self.min_size, min(self.max_size, int(size)))
+        return int(round(size / self.size_step)) * self.size_step
+
+    def get(self, name: str, frame_index: int, frame: np.ndarray, size: int) -> Any:
+        """Return the frame scaled to the bucket of ``size``, resizing on a miss"""
+        key = (name, frame_index, self.bucket(size))
+        with self._lock:
+            sprite = self._sprites.get(key)
+            if sprite is not None:
+                self._sprites.move_to_end(key)
+                self.hits += 1
+                return sprite
+            self.misses += 1
+
+        sprite = self._scale(frame, key[2])
+        with self._lock:
+            self._insert(key, sprite)
+        return sprite
+
+    def warm_up(self, name: str, frames: Sequence[np.ndarray], sizes: Iterable[int]) -> int:
+        """Eagerly scale every frame of an effect to the given sizes"""
+        added = 0
+        for size in sorted({self.bucket(s) for s in sizes}):
+            for frame_index, frame in enumerate(frames):
+                key = (name, frame_index, size)
+                if key in self._sprites:
+                    continue
+                sprite = self._scale(frame, size)
+                with self._lock:
+                    self._insert(key, sprite)
+                added += 1
+        return added
+
+    def clear(self) -> None:
+        """Drop all cached sprites (counters are kept)"""
+        with self._lock:
+            self._sprites.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and memory usage"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self._sprites),
+            'bytes': self.current_bytes,
+        }
+
+    def _scale(self, frame: np.ndarray, size: int) -> Any:
+        if self.scale is not None:
+            return self.scale(frame, size)
+        return cv2.resize(frame, (size, size), interpolation=cv2.INTER_LINEAR)
+
+    def _insert(self, key: SpriteKey, sprite: Any) -> None:
+        if sprite.nbytes > self.max_bytes or key in self._sprites:
+            return  # Never cacheable, caller still gets the sprite
+        self._sprites[key] = sprite
+        self.current_bytes += sprite.nbytes
+
+        # Evict least recently used sprites until we fit the budget
+        while self.current_bytes > self.max_bytes:
+            _, evicted = self._sprites.popitem(last=False)
+            self.current_bytes -= evicted.nbytes
+            self.evictions += 1
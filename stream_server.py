@@ -0,0 +1,313 @@
+import argparse
+import cv2
+import numpy as np
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Union
+
+from pipeline import DropOldestQueue, StageStats
+
+Source = Union[int, str]
+
+
+class SyntheticSource:
+    """Stand-in for a camera: a moving test pattern at a fixed frame rate
+
+    Has the ``read``/``release``/``get`` subset of ``cv2.VideoCapture`` the
+    stream manager uses, so server mode can be exercised without hardware.
+    """
+
+    def __init__(self, width: int = 640, height: int = 480, fps: float = 30.0,
+                 frames: Optional[int] = None, seed: int = 0):
+        self.fps = fps
+        self.frames = frames              # Stop after this many frames (None = endless)
+        self.index = 0
+        self._background = np.random.default_rng(seed).integers(
+            0, 64, (height, width, 3), dtype=np.uint8)
+        self._frame = np.empty_like(self._background)
+
+    def read(self):
+        if self.frames is not None and self.index >= self.frames:
+            return False, None
+        h, w = self._background.shape[:2]
+        angle = self.index / 15
+        center = (int(w / 2 + w / 4 * np.cos(angle)), int(h / 2 + h / 4 * np.sin(angle)))
+        np.copyto(self._frame, self._background)
+        cv2.circle(self._frame, center, h // 8, (60, 160, 230), -1)
+        self.index += 1
+        return True, self._frame.copy()
+
+    def get(self, prop: int) -> float:
+        return self.fps if prop == cv2.CAP_PROP_FPS else 0.0
+
+    def release(self) -> None:
+        pass
+
+
+def open_source(source: Source):
+    """Open a camera index, a video file, or ``synthetic[:WxH]`` as a capture object"""
+    if isinstance(source, str) and source.startswith("synthetic"):
+        _, _, size = source.partition(":")
+        width, height = (int(v) for v in size.split("x")) if size else (640, 480)
+        return SyntheticSource(width, height)
+
+    cap = cv2.VideoCapture(source)
+    if isinstance(source, int):
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        cap.set(cv2.CAP_PROP_FPS, 30)
+    return cap
+
+
+class Stream:
+    """One input source with its own tracker, frame queue and statistics
+
+    Hand state (identities, trails, smoothing) lives in the stream's own
+    HandEffectTracker, so streams never see each other's hands.
+    """
+
+    def __init__(self, name: str, source: Source, cap, tracker, queue_size: int = 2):
+        self.name = name
+        self.source = source
+        self.cap = cap
+        self.tracker = tracker
+        self.queue = DropOldestQueue(queue_size)
+        self.stages = {stage: StageStats(stage) for stage in ('capture', 'process', 'end_to_end')}
+
+        self.output: Optional[np.ndarray] = None   # Latest rendered frame
+        self.output_index = 0                       # Bumped whenever ``output`` changes
+        self.busy = False                           # A worker is processing this stream
+        self.finished = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pace_fps(self) -> Optional[float]:
+        """Video files and synthetic sources are paced at their native rate, cameras are not"""
+        if isinstance(self.source, int):
+            return None
+        return self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+
+    def stats(self) -> Dict[str, float]:
+        process = self.stages['process'].snapshot()
+        return {
+            'fps': process['fps'],
+            'process_ms': process['avg_ms'],
+            'latency_ms': self.stages['end_to_end'].snapshot()['avg_ms'],
+            'capture_fps': self.stages['capture'].snapshot()['fps'],
+            'queue_depth': len(self.queue),
+            'dropped': self.queue.dropped,
+            'frames': process['count'],
+            'hands': len(self.tracker.hand_points),
+        }
+
+
+class StreamManager:
+    """Serves several input sources from one process
+
+    Every stream has a capture thread feeding a small drop-oldest queue, so
+    a stream that falls behind loses its oldest frames instead of building
+    latency (backpressure never reaches the camera). A fixed pool of worker
+    threads runs ``process_frame`` for whichever stream is next in
+    round-robin order among those with a queued frame and no frame in
+    flight, so a busy camera cannot starve the others. MediaPipe releases
+    the GIL while its graph runs, which lets the workers overlap inference.
+
+    Effects and the sprite cache are loaded once and shared by all streams.
+    """
+
+    def __init__(self, workers: int = 2, queue_size: int = 2,
+                 tracker_factory: Optional[Callable[[], object]] = None):
+        if tracker_factory is None:
+            from main import HandEffectTracker
+            tracker_factory = HandEffectTracker
+        self.tracker_factory = tracker_factory
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+
+        self.streams: List[Stream] = []
+        self._next = 0                            # Round-robin position
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def add_stream(self, source: Source, name: Optional[str] = None) -> Stream:
+        """Register a source; call before ``start``"""
+        tracker = self.tracker_factory()
+        if self.streams:
+            tracker.share_effects(self.streams[0].tracker)
+        tracker.frame_pool.ensure_slots(3)  # ``output`` stays intact while the next frame is prepared
+        stream = Stream(name or f"stream-{len(self.streams)}", source,
+                        open_source(source), tracker, self.queue_size)
+        self.streams.append(stream)
+        return stream
+
+    def start(self) -> None:
+        for stream in self.streams:
+            stream._thread = threading.Thread(target=self._capture_loop, args=(stream,),
+                                              name=f"capture-{stream.name}", daemon=True)
+            stream._thread.start()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        self._stop.set()
+        for stream in self.streams:
+            stream.queue.close()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads + [s._thread for s in self.streams if s._thread]:
+            thread.join(timeout=2.0)
+        for stream in self.streams:
+            stream.cap.release()
+            stream.tracker.hands.close()
+
+    @property
+    def finished(self) -> bool:
+        """True once every source is exhausted and its frames were processed"""
+        return all(stream.finished for stream in self.streams)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-stream FPS, latency, queue depth and drop counters"""
+        return {stream.name: stream.stats() for stream in self.streams}
+
+    def _capture_loop(self, stream: Stream) -> None:
+        pace_fps = stream.pace_fps
+        interval = 1.0 / pace_fps if pace_fps else 0.0
+        next_due = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                ret, frame = stream.cap.read()
+                if not ret:
+                    break
+                captured_at = time.perf_counter()
+                stream.stages['capture'].record(captured_at - start)
+                stream.queue.put((frame, captured_at))
+                with self._cond:
+                    self._cond.notify()
+
+                if interval:
+                    next_due += interval
+                    delay = next_due - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+        finally:
+            stream.queue.close()
+            with self._cond:
+                self._cond.notify_all()
+
+    def _claim(self) -> Optional[Stream]:
+        """Next idle stream with a queued frame, in round-robin order (caller holds the lock)"""
+        count = len(self.streams)
+        for offset in range(count):
+            stream = self.streams[(self._next + offset) % count]
+            if stream.busy or stream.finished:
+                continue
+            if len(stream.queue):
+                self._next = (self._next + offset + 1) % count
+                stream.busy = True
+                return stream
+            if stream.queue.closed:
+                stream.finished = True
+        return None
+
+    def _worker_loop(self) -> None:
+        while not self._stop.is_set():
+            with self._cond:
+                stream = self._claim()
+                if stream is None:
+                    self._cond.wait(0.5)
+                    continue
+
+            try:
+                self._process(stream)
+            finally:
+                with self._cond:
+                    stream.busy = False
+                    self._cond.notify()
+
+    def _process(self, stream: Stream) -> None:
+        # Only ever process the newest frame; older queued ones are counted as dropped
+        item = stream.queue.get(timeout=0, latest=True)
+        if item is None:
+            return
+        frame, captured_at = item
+        tracker = stream.tracker
+        start = time.perf_counter()
+        output = tracker.process_frame(frame)
+        done = time.perf_counter()
+        stream.stages['process'].record(done - start)
+        stream.stages['end_to_end'].record(done - captured_at)
+        tracker.profiler.record_dropped(stream.queue.dropped)
+        stream.output = output
+        stream.output_index += 1
+
+
+def tile_outputs(streams: List[Stream], tile_size: int = 360, columns: int = 2) -> np.ndarray:
+    """Mosaic of the latest frame of every stream, labelled with its FPS and queue depth"""
+    rows = (len(streams) + columns - 1) // columns
+    mosaic = np.zeros((rows * tile_size, min(columns, len(streams)) * tile_size, 3), dtype=np.uint8)
+    for i, stream in enumerate(streams):
+        y, x = (i // columns) * tile_size, (i % columns) * tile_size
+        tile = mosaic[y:y + tile_size, x:x + tile_size]
+        if stream.output is not None:
+            cv2.resize(stream.output, (tile_size, tile_size), dst=tile, interpolation=cv2.INTER_AREA)
+        stats = stream.stats()
+        cv2.putText(tile, f"{stream.name}  {stats['fps']:4.1f} fps  q{stats['queue_depth']}",
+                    (8, 22), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1, cv2.LINE_AA)
+    return mosaic
+
+
+def print_stats(manager: StreamManager) -> None:
+    for name, stats in manager.stats().items():
+        print(f"{name:>12}: {stats['fps']:5.1f} fps, process {stats['process_ms']:.1f} ms, "
+              f"latency {stats['latency_ms']:.1f} ms, queue {stats['queue_depth']}, "
+              f"dropped {stats['dropped']}, hands {stats['hands']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve hand effects for several input sources")
+    parser.add_argument("--source", action="append", required=True,
+                        help="Camera index, video file or synthetic[:WxH]; repeat for more streams")
+    parser.add_argument("--workers", type=int, default=2,
+                        help="Worker threads shared by all streams (default: 2)")
+    parser.add_argument("--queue-size", type=int, default=2,
+                        help="Frames buffered per stream before the oldest is dropped")
+    parser.add_argument("--headless", action="store_true",
+                        help="No preview window; print per-stream statistics instead")
+    args = parser.parse_args()
+
+    manager = StreamManager(workers=args.workers, queue_size=args.queue_size)
+    for spec in args.source:
+        manager.add_stream(int(spec) if spec.isdigit() else spec, name=spec)
+
+    print(f"Serving {len(manager.streams)} stream(s) with {manager.workers} worker(s)")
+    if not args.headless:
+        print("Press ESC or 'q' to quit")
+    manager.start()
+    last_report = time.perf_counter()
+    try:
+        while not manager.finished:
+            if args.headless:
+                time.sleep(0.1)
+                if time.perf_counter() - last_report >= 5.0:
+                    print_stats(manager)
+                    last_report = time.perf_counter()
+                continue
+
+            cv2.imshow("Hand Effects - streams", tile_outputs(manager.streams))
+            key = cv2.waitKey(15) & 0xFF
+            if key == 27 or key == ord('q'):
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.stop()
+        cv2.destroyAllWindows()
+        print_stats(manager)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+import bisect
+import csv
+import json
+import threading
+import time
+import collections
+from typing import Dict, Optional
+
+import cv2
+import numpy as np
+
+from overlay import OverlayLayer
+
+# Stages of process_frame, in pipeline order
+STAGES = ('flip_resize', 'color_convert', 'inference', 'state_update',
+          'trail', 'overlay', 'debug_text', 'total')
+
+# Log-spaced histogram bucket upper edges in ms: 0.01 ms .. ~1.3 s, 4 buckets per octave
+BUCKET_EDGES_MS = [0.01 * 2 ** (i / 4) for i in range(69)]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with approximate percentiles"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_EDGES_MS) + 1)  # Last bucket catches overflow
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKET_EDGES_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, q: float) -> float:
+        """Upper edge of the bucket holding the q-th percentile (q in 0..100), capped at max"""
+        if not self.count:
+            return 0.0
+        target = q / 100.0 * self.count
+        seen = 0
+        for bucket, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target and bucket_count:
+                return min(BUCKET_EDGES_MS[bucket], self.max_ms) if bucket < len(BUCKET_EDGES_MS) \
+                    else self.max_ms
+        return self.max_ms
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p95_ms': self.percentile(95),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max_ms,
+        }
+
+
+class FrameProfiler:
+    """Opt-in per-stage latency recorder for HandEffectTracker.process_frame
+
+    Stage timing follows a start/record pattern::
+
+        t0 = profiler.clock()
+        ...work...
+        profiler.record('overlay', t0)
+
+    When disabled ``clock`` returns immediately and ``record`` is a no-op,
+    so instrumented code costs a couple of method calls per stage.
+
+    Timings are collected per thread. When one frame's stages run on
+    several threads (see pipeline.py), the worker hands its timings over
+    with ``take_stages`` and the thread that ends the frame adds them
+    back with ``merge_stages``.
+    """
+
+    def __init__(self, enabled: bool = False, export_path: Optional[str] = None):
+        self.enabled = enabled
+        self.hud_enabled = False
+        self.hud_refresh = 0.25           # Seconds between HUD text updates
+        self._hud_layer = OverlayLayer()
+        self._hud_lines = []
+        self._hud_updated = 0.0
+        self._enabled_before_hud = enabled
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+        self.hand_counts = collections.Counter()
+        self.frames = 0
+        self.dropped = 0
+
+        self._local = threading.local()  # Stage timings of the frame in progress, per thread
+        self._frame_stamps = collections.deque(maxlen=60)
+        self._recent_total = collections.deque(maxlen=60)
+
+        self._export_file = None
+        self._csv_writer = None
+        if export_path:
+            self.open_export(export_path)
+
+    def clock(self) -> float:
+        return time.perf_counter() if self.enabled else 0.0
+
+    def record(self, stage: str, start: float) -> None:
+        """Add the time since ``start`` to ``stage`` for the current frame"""
+        if not self.enabled:
+            return
+        ms = (time.perf_counter() - start) * 1000
+        current = self._current()
+        current[stage] = current.get(stage, 0.0) + ms
+
+    def take_stages(self) -> Dict[str, float]:
+        """Remove and return the stage timings this thread recorded for the current frame"""
+        stages = self._current()
+        self._local.stages = {}
+        return stages
+
+    def merge_stages(self, stages: Dict[str, float]) -> None:
+        """Add timings taken on another thread (``take_stages``) to this thread's current frame"""
+        if not self.enabled:
+            return
+        current = self._current()
+        for stage, ms in stages.items():
+            current[stage] = current.get(stage, 0.0) + ms
+
+    def record_dropped(self, total_dropped: int) -> None:
+        """Update the dropped-frame counter (e.g. from pipeline queues)"""
+        self.dropped = total_dropped
+
+    def end_frame(self, hand_count: int, start: float) -> None:
+        """Close the current frame: feed histograms and write an export row"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        stages = self.take_stages()
+        stages['total'] = (now - start) * 1000 if start else sum(stages.values())
+
+        for stage, ms in stages.items():
+            self.histograms[stage].add(ms)
+        self.hand_counts[hand_count] += 1
+        self.frames += 1
+        self._frame_stamps.append(now)
+        self._recent_total.append(stages['total'])
+
+        if self._export_file is not None:
+            self._write_row(stages, hand_count)
+
+    def toggle_hud(self) -> None:
+        """Show/hide the HUD; profiling is on while it is shown since it needs the data"""
+        self.hud_enabled = not self.hud_enabled
+        if self.hud_enabled:
+            self._enabled_before_hud = self.enabled
+            self.enabled = True
+        else:
+            self.enabled = self._enabled_before_hud
+
+    def fps(self) -> float:
+        if len(self._frame_stamps) < 2:
+            return 0.0
+        return (len(self._frame_stamps) - 1) / (self._frame_stamps[-1] - self._frame_stamps[0])
+
+    def summary(self) -> Dict:
+        return {
+            'frames': self.frames,
+            'dropped': self.dropped,
+            'hand_counts': dict(self.hand_counts),
+            'stages': {stage: hist.summary() for stage, hist in self.histograms.items() if hist.count},
+        }
+
+    def open_export(self, path: str) -> None:
+        """Stream one row per frame to ``path`` (.csv, otherwise JSON lines)"""
+        self.close()
+        self._export_file = open(path, "w", newline="")
+        if path.lower().endswith(".csv"):
+            self._csv_writer = csv.DictWriter(
+                self._export_file, fieldnames=['frame', 'time', 'hands', 'dropped'] + list(STAGES))
+            self._csv_writer.writeheader()
+
+    def close(self) -> None:
+        if self._export_file is not None:
+            self._export_file.close()
+        self._export_file = None
+        self._csv_writer = None
+
+    def draw_hud(self, frame: np.ndarray) -> None:
+        """Overlay FPS and latency figures in the top-right corner
+        
+        The figures are refreshed every ``hud_refresh`` seconds, so in between
+        the text sprites come straight from the overlay cache.
+        """
+        if not self.hud_enabled:
+            return
+        now = time.perf_counter()
+        if now - self._hud_updated >= self.hud_refresh:
+            recent = list(self._recent_total)
+            avg_ms = sum(recent) / len(recent) if recent else 0.0
+            self._hud_lines = [f"FPS {self.fps():5.1f}",
+                               f"frame {avg_ms:5.1f} ms",
+                               f"p95 {self.histograms['total'].percentile(95):5.1f} ms",
+                               f"dropped {self.dropped}"]
+            self._hud_updated = now
+        
+        x = frame.shape[1] - 190
+        for i, line in enumerate(self._hud_lines):
+            self._hud_layer.put_text(i, line, (x, 25 + 22 * i), cv2.FONT_HERSHEY_SIMPLEX,
+                                     0.55, (255, 255, 255), 1, cv2.LINE_AA)
+        self._hud_layer.composite(frame)
+        self._hud_layer.begin()
+
+    def _current(self) -> Dict[str, float]:
+        stages = getattr(self._local, 'stages', None)
+        if stages is None:
+            stages = self._local.stages = {}
+        return stages
+
+    def _write_row(self, stages: Dict[str, float], hand_count: int) -> None:
+        row = {'frame': self.frames, 'time': time.time(), 'hands': hand_count, 'dropped': self.dropped}
+        row.update({stage: round(ms, 4) for stage, ms in stages.items()})
+        if self._csv_writer is not None:
+            self._csv_writer.writerow(row)
+        else:
+            self._export_file.write(json.dumps(row) + "\n")
@@ -0,0 +1,104 @@
+import cv2
+import numpy as np
+import pytest
+
+import batch
+from batch import plan_segments
+from benchmarks.fixtures import fixture_path, load_fixture
+
+
+def test_segments_cover_every_frame_once():
+    segments = plan_segments(100, 30.0, workers=4)
+    assert segments == [(0, 25), (25, 50), (50, 75), (75, None)]
+
+    segments = plan_segments(100, 30.0, workers=1, segment_seconds=1.0)
+    assert segments == [(0, 30), (30, 60), (60, 90), (90, None)]
+
+
+def test_uneven_split_ends_at_eof():
+    segments = plan_segments(10, 30.0, workers=3)
+    assert segments == [(0, 4), (4, 8), (8, None)]
+
+
+def test_more_workers_than_frames():
+    assert plan_segments(3, 30.0, workers=8) == [(0, 1), (1, 2), (2, None)]
+
+
+def test_unknown_frame_count_is_one_segment():
+    assert plan_segments(0, 30.0, workers=4) == [(0, None)]
+
+
+class StillHand:
+    def __init__(self):
+        self.detections = load_fixture(fixture_path('one_hand'))['frames'][0]
+        self.calls = 0
+
+    def process(self, rgb):
+        self.calls += 1
+        return self.detections
+
+    def close(self):
+        pass
+
+
+class FrameList:
+    """Stands in for the imageio writer, keeping the RGB frames"""
+
+    def __init__(self):
+        self.frames = []
+
+    def append_data(self, frame):
+        self.frames.append(frame.copy())
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def segment_runner(tmp_path, monkeypatch):
+    from main import HandEffectTracker
+
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (640, 480))
+    for _ in range(24):
+        writer.write(np.full((480, 640, 3), 90, dtype=np.uint8))
+    writer.release()
+
+    trackers, outputs = [], []
+
+    def make_tracker(folder):
+        trackers.append(HandEffectTracker(folder, hands=StillHand()))
+        return trackers[-1]
+
+    def get_writer(*args, **kwargs):
+        outputs.append(FrameList())
+        return outputs[-1]
+
+    monkeypatch.setattr(batch, "HandEffectTracker", make_tracker)
+    monkeypatch.setattr(batch.imageio, "get_writer", get_writer)
+
+    def run(start, end, warmup):
+        _, written = batch._render_segment((path, "unused.mp4", start, end, warmup, 30.0, "effects"))
+        assert written == len(outputs[-1].frames)
+        return trackers[-1], outputs[-1].frames
+
+    return run
+
+
+def test_warmup_starts_at_most_at_the_first_frame(segment_runner):
+    tracker, frames = segment_runner(3, 6, warmup=10)
+    assert len(frames) == 3
+    assert tracker.hands.calls == 6  # Frames 0-5: warm-up clamped to the start of the video
+    assert tracker.frame_count == 6
+
+    tracker, frames = segment_runner(12, None, warmup=5)
+    assert len(frames) == 12
+    assert tracker.hands.calls == 17
+
+
+def test_segments_continue_the_animation(segment_runner):
+    _, sequential = segment_runner(0, None, warmup=0)
+    _, segment = segment_runner(16, None, warmup=6)
+    assert len(segment) == 8
+    for index, frame in enumerate(segment):
+        assert np.array_equal(frame, sequential[16 + index]), f"frame {16 + index} differs"
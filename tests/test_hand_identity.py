@@ -0,0 +1,92 @@
+import numpy as np
+
+from hand_identity import HandIdentityTracker
+from landmarks import HandDetections
+
+
+def _centers(*points):
+    return np.array([[x, y, 0.0] for x, y in points])
+
+
+def test_ids_follow_hands_when_detection_order_swaps():
+    tracker = HandIdentityTracker()
+    left, right = tracker.assign(_centers((0.3, 0.5), (0.7, 0.5)), ['Left', 'Right'])
+    assert left != right
+
+    # MediaPipe reports the hands the other way round
+    assert tracker.assign(_centers((0.71, 0.5), (0.31, 0.5)), ['Right', 'Left']) == [right, left]
+    assert tracker.assign(_centers((0.32, 0.5), (0.72, 0.5)), ['Left', 'Right']) == [left, right]
+
+
+def test_missing_hand_keeps_its_id_within_grace_frames():
+    tracker = HandIdentityTracker(grace_frames=3)
+    left, right = tracker.assign(_centers((0.3, 0.5), (0.7, 0.5)), ['Left', 'Right'])
+    for _ in range(3):
+        assert tracker.assign(_centers((0.3, 0.5)), ['Left']) == [left]
+        assert tracker.evicted == []
+    assert tracker.tracks[right].missed == 3
+
+    assert tracker.assign(_centers((0.3, 0.5), (0.7, 0.5)), ['Left', 'Right']) == [left, right]
+    assert tracker.tracks[right].missed == 0
+
+
+def test_missing_hand_is_evicted_after_grace_frames():
+    tracker = HandIdentityTracker(grace_frames=2)
+    left, right = tracker.assign(_centers((0.3, 0.5), (0.7, 0.5)), ['Left', 'Right'])
+    tracker.assign(_centers((0.3, 0.5)), ['Left'])
+    tracker.assign(_centers((0.3, 0.5)), ['Left'])
+    assert tracker.evicted == []
+
+    tracker.assign(_centers((0.3, 0.5)), ['Left'])
+    assert tracker.evicted == [right]
+    assert right not in tracker.tracks
+    tracker.assign(_centers((0.3, 0.5)), ['Left'])
+    assert tracker.evicted == []  # Reported once
+
+    # A hand showing up again is a new identity
+    ids = tracker.assign(_centers((0.3, 0.5), (0.7, 0.5)), ['Left', 'Right'])
+    assert ids[0] == left and ids[1] not in (left, right)
+
+
+class ScriptedHands:
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def process(self, rgb):
+        return self.frames.pop(0)
+
+    def close(self):
+        pass
+
+
+def test_tracker_keeps_hand_state_through_a_dropout():
+    from benchmarks.fixtures import make_hand
+    from main import HandEffectTracker
+
+    hand = HandDetections(np.asarray([make_hand(0.5, 0.55, 0.16)], dtype=np.float32), ['Right'])
+    gone = HandDetections(None, None)
+    grace = 3
+    frames = [hand] * 5 + [gone] * grace + [hand] + [gone] * (grace + 1)
+    tracker = HandEffectTracker(hands=ScriptedHands(frames))
+    tracker.extrapolator.interval = 1
+    tracker.identity_tracker.grace_frames = grace
+    camera = np.zeros((480, 640, 3), dtype=np.uint8)
+
+    for _ in range(5):
+        tracker.process_frame(camera)
+    (hand_id,) = tracker.hand_ids
+    state = tracker.hand_states[hand_id]
+    for _ in range(grace):
+        tracker.process_frame(camera)
+        assert tracker.hand_states.get(hand_id) is state
+
+    tracker.process_frame(camera)
+    assert tracker.hand_ids == [hand_id]
+    assert tracker.hand_states[hand_id] is state
+
+    for _ in range(grace):
+        tracker.process_frame(camera)
+    assert hand_id in tracker.hand_states
+    tracker.process_frame(camera)
+    assert tracker.identity_tracker.evicted == [hand_id]
+    assert hand_id not in tracker.hand_states
@@ -0,0 +1,96 @@
+import glob
+import math
+import os
+from collections import namedtuple
+
+import numpy as np
+import pytest
+
+from benchmarks.fixtures import FIXTURE_DIR, load_fixture, make_hand
+from landmarks import classify_gestures, hand_sizes, palm_centers
+
+Landmark = namedtuple('Landmark', 'x y z')
+
+
+# Scalar measurements as HandEffectTracker computed them before landmarks.py
+
+def _legacy_gesture(landmarks):
+    fingers = {
+        'thumb': [4, 3, 2],
+        'index': [8, 6, 5],
+        'middle': [12, 10, 9],
+        'ring': [16, 14, 13],
+        'pinky': [20, 18, 17]
+    }
+    extended_fingers = []
+    finger_positions = {}
+    for finger_name, (tip, pip, mcp) in fingers.items():
+        if finger_name == 'thumb':
+            is_extended = abs(landmarks[tip].x - landmarks[mcp].x) > 0.04
+        else:
+            is_extended = (landmarks[tip].y < landmarks[pip].y and
+                           landmarks[tip].y < landmarks[mcp].y)
+        if is_extended:
+            extended_fingers.append(finger_name)
+            finger_positions[finger_name] = (landmarks[tip].x, landmarks[tip].y)
+
+    if len(extended_fingers) == 0:
+        return "fist", None
+    elif len(extended_fingers) == 1:
+        finger_name = extended_fingers[0]
+        return f"single_{finger_name}", finger_positions[finger_name]
+    else:
+        return "open_hand", None
+
+
+def _legacy_palm_center(landmarks):
+    palm = [0, 5, 9, 13, 17]
+    return (np.mean([landmarks[i].x for i in palm]), np.mean([landmarks[i].y for i in palm]),
+            np.mean([landmarks[i].z for i in palm]))
+
+
+def _legacy_hand_size(landmarks, min_dim):
+    def distance(a, b):
+        return math.sqrt((landmarks[b].x - landmarks[a].x) ** 2 +
+                         (landmarks[b].y - landmarks[a].y) ** 2) * min_dim
+    return distance(0, 12) * 0.6 + distance(5, 17) * 1.8 + distance(0, 4) * 0.4
+
+
+def _fixture_hands():
+    hands = [frame.multi_hand_landmarks
+             for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.json")))
+             for frame in load_fixture(path)['frames'] if frame.multi_hand_landmarks is not None]
+    # Every gesture, plus random landmarks for arbitrary finger combinations
+    hands.append(np.array([make_hand(0.5, 0.5, 0.2, gesture, angle)
+                           for gesture in ("open", "index", "fist") for angle in (0.0, 0.3, -0.5)],
+                          dtype=np.float32))
+    hands.append(np.random.default_rng(0).random((200, 21, 3), dtype=np.float32))
+    return np.concatenate(hands)
+
+
+@pytest.fixture(scope="module")
+def points():
+    return _fixture_hands()
+
+
+def _as_landmarks(hand):
+    # MediaPipe hands its float32 landmarks to Python as floats
+    return [Landmark(float(x), float(y), float(z)) for x, y, z in hand]
+
+
+def test_gestures_match_scalar_logic(points):
+    gestures = classify_gestures(points)
+    expected = [_legacy_gesture(_as_landmarks(hand)) for hand in points]
+    assert gestures == expected
+    assert {name for name, _ in expected} >= {"fist", "open_hand", "single_index"}
+
+
+def test_palm_centers_match_scalar_logic(points):
+    expected = np.array([_legacy_palm_center(_as_landmarks(hand)) for hand in points])
+    np.testing.assert_allclose(palm_centers(points), expected, rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("min_dim", [480, 720])
+def test_hand_sizes_match_scalar_logic(points, min_dim):
+    expected = np.array([_legacy_hand_size(_as_landmarks(hand), min_dim) for hand in points])
+    np.testing.assert_allclose(hand_sizes(points, min_dim), expected, rtol=1e-12)
@@ -0,0 +1,93 @@
+import numpy as np
+
+from motion import LandmarkExtrapolator
+
+
+def _hand(x, y):
+    points = np.zeros((21, 3), dtype=np.float32)
+    points[:, 0] = x
+    points[:, 1] = y
+    return points
+
+
+def _still(hand_ids):
+    return {hand_id: {'position_history': [(100, 100), (100, 100)]} for hand_id in hand_ids}
+
+
+def test_detects_when_nothing_is_tracked():
+    extrapolator = LandmarkExtrapolator(interval=3)
+    assert extrapolator.should_detect({})
+
+
+def test_detects_every_interval_frames():
+    extrapolator = LandmarkExtrapolator(interval=3)
+    extrapolator.observe(np.stack([_hand(0.5, 0.5)]), [0], ['Right'])
+    decisions = []
+    for _ in range(5):
+        detect = extrapolator.should_detect(_still([0]))
+        decisions.append(detect)
+        if detect:
+            extrapolator.observe(np.stack([_hand(0.5, 0.5)]), [0], ['Right'])
+        else:
+            extrapolator.predict()
+    assert decisions == [False, False, True, False, False]
+
+
+def test_detects_fast_hands():
+    extrapolator = LandmarkExtrapolator(interval=3, max_speed=20.0)
+    extrapolator.observe(np.stack([_hand(0.5, 0.5)]), [0], ['Right'])
+    assert extrapolator.should_detect({0: {'position_history': [(100, 100), (160, 100)]}})
+    assert extrapolator.should_detect({})  # Tracked hand without state
+
+
+def test_predicts_constant_velocity():
+    extrapolator = LandmarkExtrapolator(interval=4)
+    extrapolator.observe(np.stack([_hand(0.40, 0.50)]), [0], ['Left'])
+    extrapolator.observe(np.stack([_hand(0.42, 0.49)]), [0], ['Left'])
+
+    for step in (1, 2, 3):
+        predicted = extrapolator.predict()
+        assert predicted.multi_handedness == ['Left']
+        np.testing.assert_allclose(predicted.multi_hand_landmarks[0],
+                                   _hand(0.42 + 0.02 * step, 0.49 - 0.01 * step), atol=1e-6)
+    assert extrapolator.frames_since_detection == 3
+
+
+def test_detection_resets_the_step():
+    extrapolator = LandmarkExtrapolator(interval=4)
+    extrapolator.observe(np.stack([_hand(0.40, 0.50)]), [0], ['Right'])
+    extrapolator.predict()
+    extrapolator.predict()
+    # Three frames after the first detection: velocity is per frame
+    extrapolator.observe(np.stack([_hand(0.46, 0.50)]), [0], ['Right'])
+    assert extrapolator.frames_since_detection == 0
+    predicted = extrapolator.predict()
+    np.testing.assert_allclose(predicted.multi_hand_landmarks[0], _hand(0.48, 0.50), atol=1e-6)
+
+
+def test_capture_index_measures_gaps():
+    extrapolator = LandmarkExtrapolator(interval=4)
+    extrapolator.observe(np.stack([_hand(0.40, 0.50)]), [0], ['Right'], frame=10)
+    extrapolator.observe(np.stack([_hand(0.44, 0.50)]), [0], ['Right'], frame=14)
+    # Frames 15 and 16 were never rendered
+    predicted = extrapolator.predict(frame=17)
+    np.testing.assert_allclose(predicted.multi_hand_landmarks[0], _hand(0.47, 0.50), atol=1e-6)
+    assert extrapolator.frames_since_detection == 3
+
+
+def test_forgets_hands_that_left():
+    extrapolator = LandmarkExtrapolator()
+    extrapolator.observe(np.stack([_hand(0.3, 0.5), _hand(0.7, 0.5)]), [0, 1], ['Left', 'Right'])
+    extrapolator.observe(np.stack([_hand(0.7, 0.5)]), [1], ['Right'])
+    predicted = extrapolator.predict()
+    assert predicted.multi_hand_landmarks.shape == (1, 21, 3)
+    assert predicted.multi_handedness == ['Right']
+    assert list(extrapolator._labels) == [1]
+
+
+def test_reset_forgets_everything():
+    extrapolator = LandmarkExtrapolator(interval=3)
+    extrapolator.observe(np.stack([_hand(0.5, 0.5)]), [0], ['Right'])
+    extrapolator.reset()
+    assert extrapolator.should_detect(_still([0]))
+    assert extrapolator.predict().multi_hand_landmarks is None
@@ -0,0 +1,67 @@
+import cv2
+import numpy as np
+import pytest
+
+from overlay import OverlayLayer
+
+FRAME_SIZE = 720
+TEXTS = ["Hand 0: open_hand (Right)", "FPS  30.0", "gjpqy|_[]@"]
+FONTS = [cv2.FONT_HERSHEY_SIMPLEX, cv2.FONT_HERSHEY_SCRIPT_SIMPLEX,
+         cv2.FONT_HERSHEY_TRIPLEX | cv2.FONT_ITALIC]
+# Interior positions and positions where the text crosses each frame edge
+POSITIONS = [(10, 40), (200, 300), (0, 5), (0, 0), (-3, 2), (300, -2), (600, 715), (590, 10), (5, 719)]
+
+
+def _frame():
+    frame = np.empty((FRAME_SIZE, FRAME_SIZE, 3), dtype=np.uint8)
+    frame[...] = np.arange(FRAME_SIZE, dtype=np.uint8)[:, None, None]
+    return frame
+
+
+def _max_diff(a, b):
+    return int(np.abs(a.astype(np.int16) - b.astype(np.int16)).max())
+
+
+@pytest.mark.parametrize("text", TEXTS)
+@pytest.mark.parametrize("font", FONTS)
+@pytest.mark.parametrize("scale,thickness", [(0.6, 2), (1.0, 1), (2.0, 3)])
+def test_text_matches_put_text(text, font, scale, thickness):
+    for line_type, tolerance in ((cv2.LINE_8, 0), (cv2.LINE_AA, 8)):
+        for org in POSITIONS:
+            expected, actual = _frame(), _frame()
+            cv2.putText(expected, text, org, font, scale, (0, 255, 0), thickness, line_type)
+            layer = OverlayLayer()
+            layer.put_text(0, text, org, font, scale, (0, 255, 0), thickness, line_type)
+            layer.composite(actual)
+            assert _max_diff(expected, actual) <= tolerance, (line_type, org)
+
+
+@pytest.mark.parametrize("center", [(100, 100), (0, 0), (719, 360), (4, 715), (-3, 50)])
+@pytest.mark.parametrize("radius", [3, 8, 15])
+def test_circle_matches_cv2_circle(center, radius):
+    expected, actual = _frame(), _frame()
+    cv2.circle(expected, center, radius, (0, 0, 255), -1)
+    layer = OverlayLayer()
+    layer.circle(0, center, radius, (0, 0, 255))
+    layer.composite(actual)
+    assert _max_diff(expected, actual) == 0
+
+
+def test_unchanged_elements_come_from_cache():
+    layer = OverlayLayer()
+    frame = _frame()
+    for _ in range(5):
+        layer.put_text('label', "steady", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+        layer.circle('marker', (50, 50), 8, (255, 0, 0))
+        layer.composite(frame)
+        layer.begin()
+    assert layer.cache.rasterized == 2
+    assert layer.cache.hits == 8
+
+
+def test_blank_text_draws_nothing():
+    frame = _frame()
+    layer = OverlayLayer()
+    layer.put_text(0, " ", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+    layer.composite(frame)
+    assert _max_diff(frame, _frame()) == 0
@@ -0,0 +1,149 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from benchmarks.fixtures import fixture_path, load_fixture
+from pipeline import DropOldestQueue, FramePipeline
+
+
+class CountingHands:
+    """Returns the same detection every call and counts the calls"""
+
+    def __init__(self, detections):
+        self.detections = detections
+        self.calls = 0
+
+    def process(self, rgb):
+        self.calls += 1
+        return self.detections
+
+    def close(self):
+        pass
+
+
+def _camera_frame():
+    return np.random.default_rng(0).integers(0, 256, (480, 640, 3), dtype=np.uint8)
+
+
+def _tracker(interval):
+    from main import HandEffectTracker
+
+    detections = load_fixture(fixture_path('one_hand'))['frames'][0]
+    tracker = HandEffectTracker(hands=CountingHands(detections))
+    tracker.extrapolator.interval = interval
+    return tracker
+
+
+def _run(tracker, indices, queue_size=2):
+    """Push captured frames through inference before rendering any, then drain the render queue"""
+    pipeline = FramePipeline(tracker, cap=None, queue_size=queue_size)
+    pipeline.capture_queue = DropOldestQueue(len(indices))
+    frame = _camera_frame()
+    rendered = []
+    for index in indices:
+        pipeline.capture_queue.put((frame, 0.0, index))
+    pipeline.capture_queue.close()
+    pipeline._inference_loop()
+    while not pipeline.finished:
+        rendered.append(pipeline.next_frame(timeout=0))
+    return pipeline, rendered
+
+
+def test_render_stage_keeps_detections_behind_predicted_frames():
+    tracker = _tracker(interval=4)
+    tracker.process_frame(_camera_frame())  # First detection, so later frames may be skipped
+    # Frames 1-3 are extrapolated, 4 is detected, 5-6 are extrapolated; with rendering behind,
+    # the render queue ends up holding frame 4 and frame 6
+    pipeline, rendered = _run(tracker, range(1, 7))
+
+    assert len(rendered) == 2
+    assert tracker.hands.calls == 2
+    assert tracker.extrapolator.detections == tracker.hands.calls
+    assert tracker.extrapolator.predictions == 1
+    assert pipeline.render_queue.dropped == 4
+
+
+def test_prediction_counts_captured_frames():
+    tracker = _tracker(interval=4)
+    tracker.process_frame(_camera_frame())
+    _run(tracker, range(1, 7))
+
+    # Frame 6 is rendered two captured frames after the detection on frame 4,
+    # although it is the first frame rendered after it
+    assert tracker.extrapolator.frames_since_detection == 2
+
+
+def test_queue_drops_oldest_when_full():
+    queue = DropOldestQueue(2)
+    assert queue.put(1) is None
+    assert queue.put(2) is None
+    assert queue.put(3) == 1
+    assert queue.dropped == 1
+    assert [queue.get(timeout=0), queue.get(timeout=0)] == [2, 3]
+
+
+def test_queue_latest_discards_older_items():
+    queue = DropOldestQueue(3)
+    for item in (1, 2, 3):
+        queue.put(item)
+    assert queue.get(latest=True) == 3
+    assert queue.dropped == 2
+    assert len(queue) == 0
+
+
+def test_queue_keeps_marked_items():
+    queue = DropOldestQueue(2, keep=lambda item: item.startswith('detected'))
+    queue.put('predicted 1')
+    queue.put('detected 2')
+    assert queue.put('predicted 3') == 'predicted 1'
+    assert queue.put('predicted 4') == 'predicted 3'
+    assert queue.get(latest=True) == 'detected 2'
+    assert queue.get(latest=True) == 'predicted 4'
+    assert queue.dropped == 2
+
+
+def test_queue_get_times_out():
+    queue = DropOldestQueue(2)
+    start = time.perf_counter()
+    assert queue.get(timeout=0.05) is None
+    assert time.perf_counter() - start >= 0.04
+
+
+def test_queue_close_wakes_consumer():
+    queue = DropOldestQueue(2)
+    threading.Timer(0.05, queue.close).start()
+    assert queue.get(timeout=5) is None
+    assert queue.closed
+
+
+def test_queue_close_keeps_queued_items():
+    queue = DropOldestQueue(2)
+    queue.put(1)
+    queue.close()
+    assert queue.get(timeout=0) == 1
+    assert queue.get(timeout=0) is None
+
+
+def test_blocking_put_waits_for_room():
+    queue = DropOldestQueue(1)
+    queue.put(1)
+    threading.Timer(0.05, queue.get).start()
+    assert queue.put(2, block=True) is None
+    assert queue.dropped == 0
+    assert queue.get(timeout=0) == 2
+
+
+def test_pipelined_run_keeps_the_pipeline(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (640, 480))
+    for _ in range(10):
+        writer.write(_camera_frame())
+    writer.release()
+
+    tracker = _tracker(interval=1)
+    tracker.run(path, pipelined=True, show_window=False)
+    stats = tracker.pipeline.stats()
+    assert stats['render']['count'] == tracker.frame_count > 0
+    assert stats['inference']['dropped'] == tracker.pipeline.render_queue.dropped
@@ -0,0 +1,134 @@
+import tracemalloc
+
+import cv2
+import numpy as np
+import pytest
+
+from landmarks import HandDetections
+from preprocess import FrameBufferPool
+
+CAMERA_SIZES = [(480, 640), (720, 1280), (1080, 1920)]
+
+
+def _camera_frame(shape, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, shape + (3,), dtype=np.uint8)
+
+
+def _legacy_square(frame):
+    """Preprocessing as HandEffectTracker._prepare_frame did before the pool"""
+    frame = cv2.resize(cv2.flip(frame, 1), (960, 720))
+    x_start = (960 - 720) // 2
+    return frame[:, x_start:x_start + 720]
+
+
+@pytest.mark.parametrize("shape", CAMERA_SIZES)
+def test_square_matches_legacy_path(shape):
+    frame = _camera_frame(shape)
+    pool = FrameBufferPool(frame_size=(960, 720))
+    square = pool.square(frame)
+    expected = _legacy_square(frame)
+    assert square.shape == (720, 720, 3)
+    # Resizing the pre-cropped region only differs in the outermost columns
+    assert np.array_equal(square[:, 1:-1], expected[:, 1:-1])
+    assert np.array_equal(pool.to_rgb(square), cv2.cvtColor(square, cv2.COLOR_BGR2RGB))
+
+
+@pytest.mark.parametrize("shape", CAMERA_SIZES)
+def test_steady_state_allocates_no_frame_buffers(shape):
+    frame = _camera_frame(shape)
+    pool = FrameBufferPool(frame_size=(960, 720))
+
+    def prepare():
+        square = pool.square(frame)
+        pool.downscale(pool.to_rgb(square), 256)
+
+    prepare()  # Creates the lazily allocated buffers
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        for _ in range(20):
+            prepare()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # A single 720x720 square is 1.5 MB; allow Python-level bookkeeping only
+    assert peak - base < 4096
+
+
+def test_squares_rotate_through_slots():
+    pool = FrameBufferPool(frame_size=(960, 720), slots=2)
+    first = pool.square(_camera_frame((480, 640), seed=1))
+    kept = first.copy()
+    second = pool.square(_camera_frame((480, 640), seed=2))
+    assert second is not first and np.array_equal(first, kept)
+    assert pool.square(_camera_frame((480, 640), seed=3)) is first  # Overwritten after slots calls
+
+    pool.ensure_slots(4)
+    squares = [pool.square(_camera_frame((480, 640))) for _ in range(4)]
+    assert len({id(square) for square in squares}) == 4
+
+
+def test_process_frame_returns_pooled_square():
+    from main import HandEffectTracker
+
+    class NoHands:
+        def process(self, rgb):
+            return HandDetections(None, None)
+
+        def close(self):
+            pass
+
+    tracker = HandEffectTracker(hands=NoHands())
+    frame = _camera_frame((480, 640))
+    outputs = [tracker.process_frame(frame) for _ in range(3)]
+    assert outputs[0] is not outputs[1]
+    assert outputs[2] is outputs[0]  # Documented: valid for slots - 1 more calls
+
+
+@pytest.mark.parametrize("side", [128, 200, 300])
+def test_roi_crop_matches_legacy_path(side):
+    image = _camera_frame((720, 720))
+    pool = FrameBufferPool(frame_size=(960, 720))
+    crop = image[50:50 + side, 70:70 + side]
+    if side > 256:
+        crop = cv2.resize(crop, (256, 256), interpolation=cv2.INTER_AREA)
+
+    roi = pool.crop(image, 70, 50, side, 256)
+    assert roi.flags['C_CONTIGUOUS']
+    assert np.array_equal(roi, crop)
+    assert np.shares_memory(pool.crop(image, 0, 0, side, 256), roi)  # Reused
+
+
+def test_process_frame_steady_state_with_roi_tracking():
+    from benchmarks.fixtures import fixture_path, load_fixture
+    from main import HandEffectTracker
+
+    class StillHand:
+        def __init__(self):
+            self.detections = load_fixture(fixture_path('one_hand'))['frames'][0]
+
+        def process(self, rgb):
+            return self.detections
+
+        def close(self):
+            pass
+
+    tracker = HandEffectTracker(hands=StillHand())
+    tracker.config['roi_tracking'] = True
+    tracker.roi_tracker.full_frame_interval = 10 ** 6
+    frame = _camera_frame((480, 640))
+    # Until every animation frame was drawn once, sprite cache misses allocate
+    for _ in range(2 * max(len(tracker.effects[name]["frames"]) for name in tracker.effects)):
+        tracker.process_frame(frame)
+    assert tracker.roi_tracker.roi_passes > 0
+
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        for _ in range(20):
+            tracker.process_frame(frame)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # The smallest ROI crop alone is 48 KB
+    assert peak - base < 16 * 1024
@@ -0,0 +1,123 @@
+import json
+
+import numpy as np
+import pytest
+
+from benchmarks.fixtures import fixture_path, load_fixture
+from session_log import MAGIC, SessionLog, SessionRecorder, replay_session
+
+
+class FixtureHands:
+    """Returns the fixture's detections in order"""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.index = 0
+
+    def process(self, rgb):
+        detections = self.frames[self.index % len(self.frames)]
+        self.index += 1
+        return detections
+
+    def close(self):
+        pass
+
+
+class NoHands:
+    """Fails the test if replay runs detection"""
+
+    def process(self, rgb):
+        raise AssertionError("replay must not run detection")
+
+    def close(self):
+        pass
+
+
+def _hands(count, seed):
+    return np.random.default_rng(seed).random((count, 21, 3), dtype=np.float32)
+
+
+def _record(path, frames):
+    recorder = SessionRecorder(str(path), metadata={'source': 'test'})
+    for index, (points, labels, predicted) in enumerate(frames):
+        recorder.write(points, labels, timestamp=index / 30, predicted=predicted)
+    recorder.close()
+    return SessionLog(str(path))
+
+
+def test_round_trip(tmp_path):
+    frames = [
+        (_hands(1, 0), ['Left'], False),
+        (_hands(0, 1), [], False),                  # No hands detected
+        (_hands(2, 2), ['Right', None], True),      # Extrapolated: stored as a flag only
+        (_hands(2, 3), ['Right', 'Left'], False),
+        (_hands(1, 4), [], False),                  # Missing label
+    ]
+    log = _record(tmp_path / "session.hlog", frames)
+
+    assert len(log) == 5
+    assert log.metadata['source'] == 'test'
+    assert log.fps == pytest.approx(30.0)
+    assert log.predicted.tolist() == [0, 0, 1, 0, 0]
+    assert log.hand_offsets.tolist() == [0, 1, 1, 1, 3, 4]
+    assert log.landmarks.shape == (4, 21, 3)
+    assert log.handedness.tolist() == [1, 2, 1, 0]
+
+    expected_hands = [frames[0][0], None, None, frames[3][0], frames[4][0]]
+    expected_labels = [['Left'], None, None, ['Right', 'Left'], [None]]
+    for detections, points, labels in zip(log, expected_hands, expected_labels):
+        if points is None:
+            assert detections.multi_hand_landmarks is None
+        else:
+            np.testing.assert_array_equal(detections.multi_hand_landmarks, points)
+        assert detections.multi_handedness == labels
+
+
+def test_reads_version_1_files(tmp_path):
+    path = tmp_path / "v1.hlog"
+    _record(path, [(_hands(1, 0), ['Left'], False), (_hands(2, 1), ['Left', 'Right'], False)])
+
+    # Rewrite the header as version 1 wrote it: no predicted column
+    with open(path, "r+b") as f:
+        f.seek(len(MAGIC))
+        header_size = int(np.frombuffer(f.read(4), dtype='<u4')[0])
+        header = json.loads(f.read(header_size))
+        header['version'] = 1
+        del header['columns']['predicted']
+        encoded = json.dumps(header).encode()
+        f.seek(len(MAGIC) + 4)
+        f.write(encoded.ljust(header_size))
+
+    log = SessionLog(str(path))
+    assert log.predicted.tolist() == [0, 0]
+    assert log.hand_offsets.tolist() == [0, 1, 3]
+    assert log[1].multi_handedness == ['Left', 'Right']
+
+
+def _tracker(hands):
+    from main import HandEffectTracker
+
+    tracker = HandEffectTracker(hands=hands)
+    tracker.extrapolator.interval = 2  # Record predicted frames too
+    return tracker
+
+
+def test_replay_matches_live_rendering(tmp_path):
+    fixture = load_fixture(fixture_path('two_hands'))
+    camera = np.zeros((480, 640, 3), dtype=np.uint8)  # Replay draws on black as well
+    path = str(tmp_path / "live.hlog")
+
+    live = _tracker(FixtureHands(fixture['frames']))
+    live.recorder = SessionRecorder(path)
+    expected = [live.process_frame(camera).copy() for _ in range(40)]
+    live.recorder.close()
+    assert any(frame.any() for frame in expected)
+
+    log = SessionLog(path)
+    assert 0 < log.predicted.sum() < len(log)
+    replay = _tracker(NoHands())
+    outputs = [output.copy() for output in replay_session(replay, log)]
+
+    assert len(outputs) == len(expected)
+    for index, (output, frame) in enumerate(zip(outputs, expected)):
+        assert np.array_equal(output, frame), f"frame {index} differs"
@@ -0,0 +1,130 @@
+import time
+import uuid
+
+import numpy as np
+import pytest
+
+import sinks
+from sinks import EncoderSink, SharedMemoryReader, SharedMemorySink
+
+SHAPE = (48, 64, 3)
+
+
+def _frame(value):
+    return np.full(SHAPE, value, dtype=np.uint8)
+
+
+@pytest.fixture
+def ring():
+    sink = SharedMemorySink(f"test_{uuid.uuid4().hex[:12]}", shape=SHAPE, slots=4)
+    reader = SharedMemoryReader(sink.shm.name)
+    yield sink, reader
+    reader.close()
+    if sink._header is not None:
+        sink.close()
+
+
+def test_reader_gets_every_frame_when_keeping_up(ring):
+    sink, reader = ring
+    assert reader.shape == SHAPE
+    assert reader.read() is None
+    for value in range(1, 21):
+        sink.write(_frame(value))
+        sequence, _, frame = reader.read()
+        assert sequence == value
+        assert (frame == value).all()
+    assert reader.read() is None
+    assert (reader.frames, reader.missed, reader.torn) == (20, 0, 0)
+
+
+def test_slow_reader_gets_newest_frame_and_counts_missed(ring):
+    sink, reader = ring
+    for value in range(1, 11):
+        sink.write(_frame(value))
+    sequence, _, frame = reader.read()
+    assert sequence == 10 and (frame == 10).all()
+    for value in range(11, 14):
+        sink.write(_frame(value))
+    out = np.empty(SHAPE, dtype=np.uint8)
+    sequence, _, frame = reader.read(out)
+    assert sequence == 13 and frame is out and (out == 13).all()
+    assert reader.missed == 2
+
+
+def test_slot_being_written_is_reported_as_torn(ring):
+    sink, reader = ring
+    sink.write(_frame(1))
+    sink._slot_sequences[1][0] = 0  # As if the writer were overwriting the slot right now
+    assert reader.read() is None
+    assert reader.torn > 0 and reader.frames == 0
+
+
+def test_wrong_shape_is_dropped_and_close_is_visible(ring):
+    sink, reader = ring
+    sink.write(np.zeros((10, 10, 3), dtype=np.uint8))
+    assert sink.stats()['dropped'] == 1
+    assert not reader.closed
+    sink.close()
+    assert reader.closed
+
+
+def test_existing_block_reports_a_clear_error(ring):
+    sink, _ = ring
+    with pytest.raises(FileExistsError, match="already exists"):
+        SharedMemorySink(sink.shm.name, shape=SHAPE)
+
+
+def _encoded_frames(path):
+    import imageio
+    reader = imageio.get_reader(path)
+    try:
+        return reader.count_frames()
+    finally:
+        reader.close()
+
+
+def test_blocking_encoder_keeps_every_frame(tmp_path):
+    path = str(tmp_path / "out.mp4")
+    sink = EncoderSink(path, fps=30, queue_size=2, block=True)
+    for value in range(60):
+        sink.write(_frame(value * 4))
+    sink.close()  # Drains the queue before finalizing the file
+    assert sink.stats()['frames'] == 60 and sink.dropped == 0
+    assert _encoded_frames(path) == 60
+
+
+def test_dropping_encoder_reuses_evicted_buffers(tmp_path, monkeypatch):
+    class SlowWriter:
+        def __init__(self, writer):
+            self.writer = writer
+
+        def append_data(self, image):
+            time.sleep(0.005)
+            self.writer.append_data(image)
+
+        def close(self):
+            self.writer.close()
+
+    class CountingNumpy:
+        """numpy for the sinks module, counting np.empty allocations"""
+        allocated = 0
+
+        def __getattr__(self, name):
+            return getattr(np, name)
+
+        def empty(self, *args, **kwargs):
+            CountingNumpy.allocated += 1
+            return np.empty(*args, **kwargs)
+
+    path = str(tmp_path / "out.mp4")
+    sink = EncoderSink(path, fps=30, queue_size=2)
+    sink.writer = SlowWriter(sink.writer)
+    monkeypatch.setattr(sinks, "np", CountingNumpy())
+    for value in range(100):
+        sink.write(_frame(value))
+    sink.close()
+    assert sink.dropped > 0
+    assert sink.frames + sink.dropped == 100
+    assert _encoded_frames(path) == sink.frames
+    # Queue slots, the frame being encoded and the one being written
+    assert CountingNumpy.allocated <= 2 + 2
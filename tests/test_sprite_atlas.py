@@ -0,0 +1,49 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from compositing import AlphaCompositor, premultiply
+from effect_library import EffectLibrary
+from sprite_atlas import SpriteAtlas, scale_sprite
+
+EFFECTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "effects")
+
+
+@pytest.fixture(scope="module")
+def effects():
+    library = EffectLibrary(EFFECTS, use_cache=False)
+    if not len(library):
+        pytest.skip("no bundled effects")
+    return {name: library[name] for name in library}
+
+
+def _legacy_blend(background, frame, size, x, y, compositor):
+    """Blend as before the atlas: the whole frame resized to size x size"""
+    sprite = premultiply(cv2.resize(frame, (size, size), interpolation=cv2.INTER_LINEAR))
+    compositor.blend(background[y:y + size, x:x + size], sprite.color, sprite.inv_alpha)
+
+
+def _atlas_blend(background, atlas_frame, size, x, y, compositor):
+    sprite = scale_sprite(atlas_frame, size)
+    if sprite.color.size == 0:
+        return
+    off_x, off_y = sprite.offset
+    h, w = sprite.shape[:2]
+    compositor.blend(background[y + off_y:y + off_y + h, x + off_x:x + off_x + w],
+                     sprite.color, sprite.inv_alpha)
+
+
+@pytest.mark.parametrize("size", [40, 97, 212, 400])
+def test_atlas_sprites_match_legacy_blend(effects, size):
+    background = np.random.default_rng(0).integers(0, 256, (480, 480, 3), dtype=np.uint8)
+    compositor = AlphaCompositor()
+    atlas = SpriteAtlas(effects, effects)
+    for name in effects:
+        frames = effects[name]["frames"]
+        for index in range(0, len(frames), 7):
+            expected, actual = background.copy(), background.copy()
+            _legacy_blend(expected, frames[index], size, 30, 50, compositor)
+            _atlas_blend(actual, atlas.frames(name)[index], size, 30, 50, compositor)
+            assert np.array_equal(actual, expected), f"{name} frame {index} at size {size}"
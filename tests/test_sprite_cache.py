@@ -0,0 +1,67 @@
+import numpy as np
+
+from sprite_cache import EffectSpriteCache
+
+SPRITE_BYTES = 40 * 40 * 4  # One 40x40 RGBA sprite
+
+
+def _frame(seed):
+    return np.random.default_rng(seed).integers(0, 256, (80, 80, 4), dtype=np.uint8)
+
+
+def _cache(sprites):
+    return EffectSpriteCache(max_bytes=sprites * SPRITE_BYTES, size_step=1, min_size=40, max_size=40)
+
+
+def test_hits_and_misses():
+    cache = _cache(4)
+    frame = _frame(0)
+    first = cache.get('fire', 0, frame, 40)
+    assert first.shape == (40, 40, 4)
+    assert cache.get('fire', 0, frame, 40) is first
+    cache.get('fire', 1, _frame(1), 40)
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 2, 0)
+    assert stats['hit_rate'] == 1 / 3
+    assert stats['entries'] == 2
+    assert stats['bytes'] == 2 * SPRITE_BYTES
+
+
+def test_evicts_least_recently_used_within_budget():
+    cache = _cache(3)
+    frames = [_frame(i) for i in range(4)]
+    for index in range(3):
+        cache.get('fire', index, frames[index], 40)
+    cache.get('fire', 0, frames[0], 40)       # 0 is now the most recent, 1 the oldest
+    cache.get('fire', 3, frames[3], 40)
+
+    assert list(cache._sprites) == [('fire', 2, 40), ('fire', 0, 40), ('fire', 3, 40)]
+    assert cache.current_bytes == 3 * SPRITE_BYTES <= cache.max_bytes
+    assert cache.evictions == 1
+
+    cache.get('fire', 1, frames[1], 40)       # Evicted, so scaled again
+    assert cache.misses == 5
+    assert cache.evictions == 2
+    assert ('fire', 2, 40) not in cache._sprites
+
+
+def test_sprites_over_budget_are_not_cached():
+    cache = EffectSpriteCache(max_bytes=SPRITE_BYTES - 1, size_step=1, min_size=40, max_size=40)
+    sprite = cache.get('fire', 0, _frame(0), 40)
+    assert sprite.shape == (40, 40, 4)
+    assert cache.stats()['entries'] == 0
+    assert cache.current_bytes == 0
+    assert cache.evictions == 0
+
+
+def test_sizes_snap_to_buckets():
+    cache = EffectSpriteCache(size_step=4, min_size=40, max_size=100)
+    assert cache.bucket(10) == 40
+    assert cache.bucket(61) == 60
+    assert cache.bucket(63) == 64
+    assert cache.bucket(500) == 100
+
+    frame = _frame(0)
+    sprite = cache.get('fire', 0, frame, 61)
+    assert cache.get('fire', 0, frame, 59) is sprite
@@ -0,0 +1,87 @@
+import cv2
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+
+SHADOW_OFFSETS = ((2, 2), (1, 1), (0, 0))                  # Shadow offsets, main trail last
+SHADOW_COLORS = ((0, 0, 100), (0, 0, 150), (0, 0, 255))    # Dark red to bright red
+GLOW_COLOR = (50, 50, 255)                                 # Brighter red on top of the main trail
+
+# (first point, last point + 1, thickness, color) of one polyline call
+Stroke = Tuple[int, int, int, Tuple[int, int, int]]
+
+
+class TrailRenderer:
+    """Finger trail rasterizer drawing the polyline in a few batched calls
+
+    Consecutive segments that share a thickness and a (quantized) fade
+    level are drawn as one ``cv2.polylines`` call. Stroke plans depend only
+    on trail length and thickness, so they are computed once and cached.
+    """
+
+    def __init__(self, thickness: int = 8, fade_levels: int = 8):
+        self.thickness = thickness
+        self.fade_levels = fade_levels   # Color steps along the trail; higher = smoother gradient
+        self._plans: Dict[Tuple[int, int], List[List[Stroke]]] = {}
+        self.calls = 0                   # Number of OpenCV draw calls issued
+
+    def draw(self, frame: np.ndarray, trail_points: Sequence[Tuple[int, int]],
+             shadow_passes: int = 3) -> None:
+        """Draw the trail with shadow passes and glow onto ``frame`` in place"""
+        n = len(trail_points)
+        if n < 2:
+            return
+
+        points = np.asarray(trail_points, dtype=np.int32)
+        plan = self._plan(n)
+        first_pass = len(SHADOW_OFFSETS) - shadow_passes
+
+        for pass_idx in range(first_pass, len(SHADOW_OFFSETS)):
+            shifted = points + np.array(SHADOW_OFFSETS[pass_idx], dtype=np.int32)
+            for start, end, thickness, color in plan[pass_idx]:
+                cv2.polylines(frame, [shifted[start:end]], False, color, thickness)
+                self.calls += 1
+
+        # Glow strokes over the main trail
+        for start, end, thickness, color in plan[-1]:
+            cv2.polylines(frame, [points[start:end]], False, color, thickness)
+            self.calls += 1
+
+    def _plan(self, n: int) -> List[List[Stroke]]:
+        """Stroke lists for each shadow pass plus the glow pass, for a trail of n points"""
+        key = (n, self.thickness)
+        plan = self._plans.get(key)
+        if plan is not None:
+            return plan
+
+        # Per-segment tables: segment i joins point i-1 to point i
+        seg = np.arange(1, n)
+        fade = (seg / n) * 0.8 + 0.2  # 0.2 to 1.0
+        thickness = np.maximum(1, (self.thickness * fade).astype(int))
+        level = np.minimum(self.fade_levels - 1, ((fade - 0.2) / 0.8 * self.fade_levels).astype(int))
+        glow_thickness = np.maximum(1, thickness // 2)
+
+        plan = []
+        for base_color in SHADOW_COLORS:
+            plan.append(self._runs(seg, fade, thickness, level,
+                                   lambda f, c=base_color: tuple(int(v * f) for v in c)))
+        plan.append(self._runs(seg, fade, glow_thickness, np.zeros_like(level),
+                               lambda f: GLOW_COLOR))
+
+        self._plans[key] = plan
+        return plan
+
+    @staticmethod
+    def _runs(seg: np.ndarray, fade: np.ndarray, thickness: np.ndarray,
+              level: np.ndarray, color_for) -> List[Stroke]:
+        """Group consecutive segments with equal thickness and fade level"""
+        strokes = []
+        run_start = 0
+        for i in range(1, len(seg) + 1):
+            if i < len(seg) and thickness[i] == thickness[run_start] and level[i] == level[run_start]:
+                continue
+            # Color of the run's middle segment keeps the gradient centered
+            mid = (run_start + i - 1) // 2
+            strokes.append((int(seg[run_start]) - 1, int(seg[i - 1]) + 1,
+                            int(thickness[run_start]), color_for(fade[mid])))
+            run_start = i
+        return strokes